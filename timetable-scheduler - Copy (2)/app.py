@@ -1,8 +1,11 @@
-from flask import Flask, send_file, request, render_template, redirect, url_for
-from config import SECRET_KEY, SQLALCHEMY_DATABASE_URI
-from db_extensions import db
+from flask import Flask, Response, stream_with_context, request, render_template, redirect, url_for, jsonify
+import click
+from config import (SECRET_KEY, SQLALCHEMY_DATABASE_URI, GA_ISLANDS, GA_WORKERS, MAX_CONCURRENT_JOBS, RUN_CACHE_SIZE,
+                    SOLVER_WORKERS, SOLVER_TIME_LIMIT)
+from db_extensions import db, create_schema
+import csv
+import json
 import os
-from genetic_scheduler import GeneticScheduler, DAYS
 
 # --- Initialize App ---
 app = Flask(__name__)
@@ -14,7 +17,32 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db.init_app(app)
 
 # --- Import Models AFTER db init ---
-from models import Classroom, Faculty, Subject, Batch, Timetable, SpecialClass
+from models import Classroom, Faculty, Subject, Batch, Timetable, TimetableRun, SpecialClass, GenerationJob
+from jobs import JobRunner
+from snapshot import snapshot_cache
+from runs import run_entries, iter_run_entries, RunCache
+from exporters import GROUPS, iter_html, iter_csv, iter_ics
+from repair import repair_run, run_violations
+from importer import IMPORTS, ImportFailed, import_records, read_records, text_stream
+from genetic_scheduler import DAYS, PERIODS_PER_DAY
+
+# --- Rendered runs + background generation jobs ---
+run_cache = RunCache(RUN_CACHE_SIZE)
+job_runner = JobRunner(app, max_workers=MAX_CONCURRENT_JOBS, islands=GA_ISLANDS, ga_workers=GA_WORKERS,
+                       run_cache=run_cache, solver_workers=SOLVER_WORKERS, solver_time_limit=SOLVER_TIME_LIMIT)
+
+# ---------------- STARTUP ----------------
+@app.before_request
+def resume_interrupted_jobs():
+    """Create missing tables, then re-queue the jobs the last shutdown interrupted, once per serving process.
+
+    Done on the first request rather than at import, so it happens under ``python app.py``,
+    ``flask run`` and WSGI servers alike, while CLI commands, scripts and the debug
+    reloader's watcher process (which never serves a request) leave the jobs alone.
+    Jobs run and report progress in the process that serves them, so serve the app
+    from one process (threads are fine).
+    """
+    job_runner.resume_once()
 
 # ---------------- ROOT ROUTE ----------------
 @app.route("/")
@@ -34,8 +62,7 @@ def health_db():
 # ---------------- CLASSROOM ROUTES ----------------
 @app.route("/classrooms")
 def list_classrooms():
-    classrooms = Classroom.query.all()
-    return render_template("classrooms.html", classrooms=classrooms)
+    return render_template("classrooms.html", classrooms=snapshot_cache.get().classrooms)
 
 @app.route("/classrooms/add", methods=["GET", "POST"])
 def add_classroom():
@@ -46,6 +73,7 @@ def add_classroom():
         )
         db.session.add(classroom)
         db.session.commit()
+        snapshot_cache.bump("classrooms")
         return redirect(url_for("list_classrooms"))
     return render_template("add_classroom.html")
 
@@ -56,6 +84,7 @@ def edit_classroom(id):
         classroom.name = request.form["name"]
         classroom.capacity = int(request.form["capacity"])
         db.session.commit()
+        snapshot_cache.bump("classrooms")
         return redirect(url_for("list_classrooms"))
     return render_template("edit_classroom.html", classroom=classroom)
 
@@ -64,13 +93,13 @@ def delete_classroom(id):
     classroom = Classroom.query.get_or_404(id)
     db.session.delete(classroom)
     db.session.commit()
+    snapshot_cache.bump("classrooms")
     return redirect(url_for("list_classrooms"))
 
 # ---------------- FACULTY ROUTES ----------------
 @app.route("/faculties")
 def list_faculties():
-    faculties = Faculty.query.all()
-    return render_template("faculties.html", faculties=faculties)
+    return render_template("faculties.html", faculties=snapshot_cache.get().faculties)
 
 @app.route("/faculties/add", methods=["GET", "POST"])
 def add_faculty():
@@ -82,6 +111,7 @@ def add_faculty():
         )
         db.session.add(faculty)
         db.session.commit()
+        snapshot_cache.bump("faculties")
         return redirect(url_for("list_faculties"))
     return render_template("add_faculty.html")
 
@@ -93,6 +123,7 @@ def edit_faculty(id):
         faculty.max_classes_per_day = int(request.form["max_classes_per_day"])
         faculty.avg_leaves_per_month = int(request.form["avg_leaves_per_month"])
         db.session.commit()
+        snapshot_cache.bump("faculties")
         return redirect(url_for("list_faculties"))
     return render_template("edit_faculty.html", faculty=faculty)
 
@@ -101,18 +132,18 @@ def delete_faculty(id):
     faculty = Faculty.query.get_or_404(id)
     db.session.delete(faculty)
     db.session.commit()
+    snapshot_cache.bump("faculties")
     return redirect(url_for("list_faculties"))
 
 # ---------------- SUBJECT ROUTES ----------------
 @app.route("/subjects")
 def list_subjects():
-    subjects = Subject.query.all()
-    faculties = Faculty.query.all()
-    return render_template("subjects.html", subjects=subjects, faculties=faculties)
+    snapshot = snapshot_cache.get()
+    return render_template("subjects.html", subjects=snapshot.subjects, faculties=snapshot.faculties)
 
 @app.route("/subjects/add", methods=["GET", "POST"])
 def add_subject():
-    faculties = Faculty.query.all()
+    faculties = snapshot_cache.get().faculties
     if request.method == "POST":
         subject = Subject(
             name=request.form["name"],
@@ -122,19 +153,21 @@ def add_subject():
         )
         db.session.add(subject)
         db.session.commit()
+        snapshot_cache.bump("subjects")
         return redirect(url_for("list_subjects"))
     return render_template("add_subject.html", faculties=faculties)
 
 @app.route("/subjects/edit/<int:id>", methods=["GET", "POST"])
 def edit_subject(id):
     subject = Subject.query.get_or_404(id)
-    faculties = Faculty.query.all()
+    faculties = snapshot_cache.get().faculties
     if request.method == "POST":
         subject.name = request.form["name"]
         subject.course_code = request.form["course_code"]
         subject.faculty_id = int(request.form["faculty_id"])
         subject.classes_per_week = int(request.form["classes_per_week"])
         db.session.commit()
+        snapshot_cache.bump("subjects")
         return redirect(url_for("list_subjects"))
     return render_template("edit_subject.html", subject=subject, faculties=faculties)
 
@@ -143,13 +176,13 @@ def delete_subject(id):
     subject = Subject.query.get_or_404(id)
     db.session.delete(subject)
     db.session.commit()
+    snapshot_cache.bump("subjects")
     return redirect(url_for("list_subjects"))
 
 # ---------------- BATCH ROUTES ----------------
 @app.route("/batches")
 def list_batches():
-    batches = Batch.query.all()
-    return render_template("batches.html", batches=batches)
+    return render_template("batches.html", batches=snapshot_cache.get().batches)
 
 @app.route("/batches/add", methods=["GET", "POST"])
 def add_batch():
@@ -160,6 +193,7 @@ def add_batch():
         )
         db.session.add(batch)
         db.session.commit()
+        snapshot_cache.bump("batches")
         return redirect(url_for("list_batches"))
     return render_template("add_batch.html")
 
@@ -170,6 +204,7 @@ def edit_batch(id):
         batch.name = request.form["name"]
         batch.num_students = int(request.form["num_students"])
         db.session.commit()
+        snapshot_cache.bump("batches")
         return redirect(url_for("list_batches"))
     return render_template("edit_batch.html", batch=batch)
 
@@ -178,19 +213,29 @@ def delete_batch(id):
     batch = Batch.query.get_or_404(id)
     db.session.delete(batch)
     db.session.commit()
+    snapshot_cache.bump("batches")
     return redirect(url_for("list_batches"))
 
 # ---------------- SPECIAL CLASS ROUTES ----------------
 @app.route("/special_classes")
 def list_special_classes():
-    special_classes = SpecialClass.query.all()
-    return render_template("special_classes.html", special_classes=special_classes)
+    snapshot = snapshot_cache.get()
+    return render_template("special_classes.html", special_classes=snapshot.special_classes)
+
+def _special_class_error(batch_id, day, period, id=None):
+    """Why a special class cannot go in that slot (None if it can): generation skips such rows."""
+    if day not in DAYS or not 1 <= period <= PERIODS_PER_DAY:
+        return f"❌ Special classes must be on {', '.join(DAYS)}, period 1 to {PERIODS_PER_DAY}."
+    taken = SpecialClass.query.filter(SpecialClass.batch_id == batch_id, SpecialClass.day == day,
+                                      SpecialClass.period == period, SpecialClass.id != id).first()
+    if taken is not None:
+        return f"❌ Special class #{taken.id} already holds this batch's {day} period {period}."
+    return None
 
 @app.route("/special_classes/add", methods=["GET", "POST"])
 def add_special_class():
-    subjects = Subject.query.all()
-    batches = Batch.query.all()
-    classrooms = Classroom.query.all()
+    snapshot = snapshot_cache.get()
+    subjects, batches, classrooms = snapshot.subjects, snapshot.batches, snapshot.classrooms
     if request.method == "POST":
         sc = SpecialClass(
             subject_id=int(request.form["subject_id"]),
@@ -199,72 +244,277 @@ def add_special_class():
             day=request.form["day"],
             period=int(request.form["period"])
         )
+        error = _special_class_error(sc.batch_id, sc.day, sc.period)
+        if error:
+            return error, 400
         db.session.add(sc)
         db.session.commit()
+        snapshot_cache.bump("special_classes")
         return redirect(url_for("list_special_classes"))
-    return render_template("add_special_class.html",
-                           subjects=subjects, batches=batches, classrooms=classrooms)
+    return render_template("add_special_class.html", subjects=subjects, batches=batches, classrooms=classrooms,
+                           days=DAYS, periods=PERIODS_PER_DAY)
 
 @app.route("/special_classes/edit/<int:id>", methods=["GET", "POST"])
 def edit_special_class(id):
     sc = SpecialClass.query.get_or_404(id)
-    subjects = Subject.query.all()
-    batches = Batch.query.all()
-    classrooms = Classroom.query.all()
+    snapshot = snapshot_cache.get()
+    subjects, batches, classrooms = snapshot.subjects, snapshot.batches, snapshot.classrooms
     if request.method == "POST":
+        error = _special_class_error(int(request.form["batch_id"]), request.form["day"],
+                                     int(request.form["period"]), id=sc.id)
+        if error:
+            return error, 400
         sc.subject_id = int(request.form["subject_id"])
         sc.batch_id = int(request.form["batch_id"])
         sc.room_id = int(request.form["room_id"])
         sc.day = request.form["day"]
         sc.period = int(request.form["period"])
         db.session.commit()
+        snapshot_cache.bump("special_classes")
         return redirect(url_for("list_special_classes"))
-    return render_template("edit_special_class.html",
-                           sc=sc, subjects=subjects, batches=batches, classrooms=classrooms)
+    return render_template("edit_special_class.html", sc=sc, subjects=subjects, batches=batches,
+                           classrooms=classrooms, days=DAYS, periods=PERIODS_PER_DAY)
 
 @app.route("/special_classes/delete/<int:id>")
 def delete_special_class(id):
     sc = SpecialClass.query.get_or_404(id)
     db.session.delete(sc)
     db.session.commit()
+    snapshot_cache.bump("special_classes")
     return redirect(url_for("list_special_classes"))
 
+# ---------------- BULK IMPORT ----------------
+def _import_format(filename, fmt=None):
+    return (fmt or os.path.splitext(filename or "")[1].lstrip(".") or "csv").lower()
+
+@app.route("/import/<kind>", methods=["POST"])
+def import_entities(kind):
+    """Bulk-insert faculties / classrooms / batches / subjects / special_classes in one transaction.
+
+    Send a file field "file" (.csv with a header row, .json list or .jsonl; ?format= overrides
+    the extension) or a JSON list as the body. References may be given by id or by natural
+    key: subjects take "faculty" (name), special classes "course_code", "batch" and "room" (names).
+    """
+    if kind not in IMPORTS:
+        return jsonify({"error": f"Unknown import kind, expected one of {sorted(IMPORTS)}"}), 404
+    upload = request.files.get("file")
+    try:
+        if upload is not None:
+            records = read_records(text_stream(upload.stream),
+                                   _import_format(upload.filename, request.args.get("format")))
+        else:
+            records = request.get_json(silent=True)
+            if not isinstance(records, list):
+                return jsonify({"error": "Send a file field 'file' or a JSON list of objects"}), 400
+        count = import_records(kind, records)
+    except ImportFailed as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+    except (ValueError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+    snapshot_cache.bump(kind)
+    return jsonify({"kind": kind, "imported": count}), 201
+
+@app.cli.command("import-data")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--kind", type=click.Choice(sorted(IMPORTS)),
+              help="Entity type of every file (default: each file's name, e.g. faculties.csv).")
+def import_data_command(paths, kind):
+    """Import CSV / JSON / JSONL files in the order given, all in one transaction."""
+    counts = []
+    try:
+        for path in paths:
+            file_kind = kind or os.path.splitext(os.path.basename(path))[0]
+            if file_kind not in IMPORTS:
+                raise click.UsageError(f"Can't tell what {path} holds; name it after one of "
+                                       f"{sorted(IMPORTS)} or pass --kind")
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                counts.append((path, import_records(file_kind, read_records(f, _import_format(path)))))
+    except ImportFailed as e:
+        db.session.rollback()
+        raise click.ClickException(f"{path}: " + "\n  ".join([str(e)] + e.errors))
+    except (ValueError, csv.Error) as e:
+        db.session.rollback()
+        raise click.ClickException(f"{path}: {e}")
+    db.session.commit()
+    for path, count in counts:
+        click.echo(f"✅ {path}: {count} rows imported")
+
 # ---------------- TIMETABLE GENERATION ----------------
-@app.route("/generate_timetable")
+def _job_param(name, cast=int):
+    data = request.get_json(silent=True) or request.form
+    value = data.get(name)
+    return cast(value) if value not in (None, "") else None
+
+@app.route("/generate_timetable", methods=["GET", "POST"])
 def generate_timetable():
-    subjects = Subject.query.all()
-    faculties = Faculty.query.all()
-    batches = Batch.query.all()
-    classrooms = Classroom.query.all()
-
-    if not subjects or not faculties or not batches or not classrooms:
-        return "❌ Missing data in DB. Please add data first."
-
-    scheduler = GeneticScheduler(
-        subjects=subjects,
-        faculties=faculties,
-        batches=batches,
-        classrooms=classrooms,
-        days=DAYS,
-        periods_per_day=6,
-        population_size=10
-    )
-
-    best_timetable = scheduler.run(generations=50)
-    html = scheduler.pretty_table(best_timetable)
-    scheduler.print_population_report(best_only=True)
-
-    return html
+    if request.method == "POST":
+        job = job_runner.create(
+            engine=_job_param("engine", str),
+            parts=_job_param("parts"),
+            generations=_job_param("generations"),
+            population_size=_job_param("population_size"),
+            seed=_job_param("seed"),
+            greedy_ratio=_job_param("greedy_ratio", float),
+            alternatives=_job_param("alternatives"),
+            niche_radius=_job_param("niche_radius", float),
+            hard_weight=_job_param("hard_weight", float),
+            soft_weight=_job_param("soft_weight", float),
+            local_search=_job_param("local_search", str),
+            local_search_budget=_job_param("local_search_budget", float),
+            target_fitness=_job_param("target_fitness", float),
+            stagnation=_job_param("stagnation"),
+            time_limit=_job_param("time_limit", float),
+            max_evaluations=_job_param("max_evaluations")
+        )
+        if request.is_json:
+            return jsonify(job.to_dict()), 202
+        return redirect(url_for("view_job", id=job.id))
+    jobs = GenerationJob.query.order_by(GenerationJob.id.desc()).limit(10).all()
+    return render_template("generate.html", job=None, jobs=jobs)
+
+@app.route("/jobs/<int:id>")
+def job_status(id):
+    return jsonify(GenerationJob.query.get_or_404(id).to_dict())
+
+@app.route("/jobs/<int:id>/view")
+def view_job(id):
+    job = GenerationJob.query.get_or_404(id)
+    jobs = GenerationJob.query.order_by(GenerationJob.id.desc()).limit(10).all()
+    return render_template("generate.html", job=job, jobs=jobs)
+
+@app.route("/jobs/<int:id>/events")
+def job_events(id):
+    """Server-Sent Events: one "progress" event per generation, then "end" with the job."""
+    GenerationJob.query.get_or_404(id)
+
+    def stream():
+        for event, data in job_runner.events(id):
+            if event == "ping":
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/jobs/<int:id>/stop", methods=["POST"])
+def stop_job(id):
+    job = GenerationJob.query.get_or_404(id)
+    job_runner.stop(job.id)
+    if request.is_json:
+        return jsonify(job.to_dict()), 202
+    return redirect(url_for("view_job", id=job.id))
+
+@app.route("/jobs/<int:id>/result")
+def job_result(id):
+    job = GenerationJob.query.get_or_404(id)
+    if job.status not in ("done", "stopped"):
+        return f"❌ Job {job.id} is {job.status}.", 409
+    if job.run_id is None:
+        return job.result_html or "❌ Timetable not generated yet."   # jobs from before runs were saved
+    return _run_page(job.run_id)
+
+# ---------------- RUN ROUTES ----------------
+@app.route("/runs")
+def list_runs():
+    runs = TimetableRun.query.order_by(TimetableRun.id.desc()).limit(50).all()
+    return jsonify([run.to_dict() for run in runs])
+
+@app.route("/runs/<int:id>")
+def run_detail(id):
+    """Saved run with its slots; ?batch_id= / ?faculty_id= / ?classroom_id= narrow the slots."""
+    run = TimetableRun.query.get_or_404(id)
+    entries = run_entries(run.id, **{key: request.args.get(key, type=int)
+                                     for key in ("batch_id", "faculty_id", "classroom_id")})
+    return jsonify({**run.to_dict(), "slots": [entry.to_dict() for entry in entries]})
+
+def _run_page(run_id, as_attachment=False):
+    """A run's rendered page with its ETag; answers 304 when the client already has it."""
+    page = run_cache.get(run_id)
+    if page is None:
+        return "❌ No such timetable run.", 404
+    html, etag = page
+    response = Response(html, mimetype="text/html")
+    if as_attachment:
+        response.headers["Content-Disposition"] = f"attachment; filename=timetable-run-{run_id}.html"
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route("/runs/<int:id>/timetable")
+def view_run(id):
+    return _run_page(id)
+
+@app.route("/runs/<int:id>/download")
+def download_run(id):
+    return _run_page(id, as_attachment=True)
+
+@app.route("/runs/<int:id>/export.<fmt>")
+def export_run(id, fmt):
+    """Stream a run as html / csv / ics; ?batch_id= / ?faculty_id= / ?classroom_id= export one timetable."""
+    run = TimetableRun.query.get_or_404(id)
+    if fmt not in ("html", "csv", "ics"):
+        return "❌ Unknown export format (use html, csv or ics).", 404
+
+    filters = {key: request.args.get(key, type=int) for key in GROUPS}
+    chosen = [(key, value) for key, value in filters.items() if value is not None]
+    group_by = chosen[0][0] if chosen else "batch_id"
+    name = f"timetable-run-{run.id}" + "".join(f"-{key[:-3]}-{value}" for key, value in chosen)
+
+    snapshot = snapshot_cache.get()
+    rows = iter_run_entries(run.id, group_by, **filters)
+    if fmt == "html":
+        chunks, mimetype = iter_html(rows, snapshot, run.periods_per_day or 6, group_by, title=name), "text/html"
+    elif fmt == "csv":
+        chunks, mimetype = iter_csv(rows, snapshot), "text/csv"
+    else:
+        chunks, mimetype = iter_ics(rows, snapshot, run.created_at, f"run{run.id}", name=name), "text/calendar"
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"})
+
+@app.route("/runs/<int:id>/violations")
+def run_violations_report(id):
+    """Constraint violations of a run: kind, hard, batch_id, day, period, faculty_id, subject_id, classroom_id."""
+    run = TimetableRun.query.get_or_404(id)
+    try:
+        violations = run_violations(run)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify([v._asdict() for v in violations])
+
+@app.route("/runs/<int:id>/repair", methods=["POST"])
+def repair_saved_run(id):
+    """Re-plan a run around a faculty on leave or a closed room, changing as few slots as possible.
+
+    JSON/form: faculty_id or classroom_id, plus days (list or comma-separated names)
+    or start_date / end_date (YYYY-MM-DD). The repaired timetable is saved as a new run.
+    """
+    run = TimetableRun.query.get_or_404(id)
+    data = request.get_json(silent=True) or request.form
+    days = data.get("days")
+    if isinstance(days, str):
+        days = [day.strip() for day in days.split(",") if day.strip()]
+    try:
+        result = repair_run(run, faculty_id=_job_param("faculty_id"), classroom_id=_job_param("classroom_id"),
+                            days=days, start_date=data.get("start_date"), end_date=data.get("end_date"))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+    return jsonify(result), 201
 
 @app.route("/download_timetable")
 def download_timetable():
-    path = os.path.join(os.path.dirname(__file__), "timetable.html")
-    if not os.path.exists(path):
+    """Latest run's timetable (kept for old links; use /runs/<id>/download for a specific run)."""
+    run = TimetableRun.query.order_by(TimetableRun.id.desc()).first()
+    if run is None:
         return "❌ Timetable not generated yet."
-    return send_file(path, as_attachment=True)
+    return redirect(url_for("download_run", id=run.id))
 
 # ---------------- MAIN ----------------
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        create_schema()
     app.run(debug=True)
@@ -0,0 +1,2 @@
+# benchmarks
+# Performance benchmarks for the scheduler; run each module with python -m benchmarks.<name>.
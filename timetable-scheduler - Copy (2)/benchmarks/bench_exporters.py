@@ -0,0 +1,65 @@
+"""Export throughput: pretty_table string building vs. the streaming exporters.
+
+Run from the project folder:
+    python -m benchmarks.bench_exporters --batches 200 --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from genetic_scheduler import GeneticScheduler, DAYS
+from snapshot import Snapshot
+from exporters import iter_html, iter_csv, iter_ics
+from benchmarks.instances import make_entities
+
+
+def measure(make_chunks, repeat):
+    """(seconds per export, seconds to first chunk, bytes, largest chunk in bytes)."""
+    total = first = 0.0
+    size = largest = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = iter(make_chunks())
+        head = next(chunks)
+        first += time.perf_counter() - start
+        size, largest = len(head), len(head)
+        for chunk in chunks:
+            size += len(chunk)
+            largest = max(largest, len(chunk))
+        total += time.perf_counter() - start
+    return total / repeat, first / repeat, size, largest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--subjects", type=int, default=120)
+    parser.add_argument("--faculties", type=int, default=80)
+    parser.add_argument("--rooms", type=int, default=60)
+    parser.add_argument("--periods", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    subjects, faculties, batches, rooms = make_entities(args.batches, args.subjects, args.faculties, args.rooms)
+    scheduler = GeneticScheduler(subjects, faculties, batches, rooms, DAYS, args.periods, seed=0)
+    genome = scheduler.generate_random_timetable()
+    snapshot = Snapshot(faculties, subjects, batches, rooms, ())
+    rows = [SimpleNamespace(id=i, **slot) for i, slot in enumerate(scheduler.assignments(genome))]
+    week_of = datetime(2024, 1, 1)
+
+    cases = [
+        ("pretty_table (str +=)", lambda: [scheduler.pretty_table(genome)]),
+        ("iter_html", lambda: iter_html(rows, snapshot, args.periods)),
+        ("iter_csv", lambda: iter_csv(rows, snapshot)),
+        ("iter_ics", lambda: iter_ics(rows, snapshot, week_of, "bench")),
+    ]
+    print(f"{args.batches} batches x {len(DAYS)} days x {args.periods} periods, {len(rows)} slots")
+    for label, make_chunks in cases:
+        seconds, first, size, largest = measure(make_chunks, args.repeat)
+        print(f"{label:<22}: {seconds * 1000:8.1f} ms, {size / seconds / 1e6:6.1f} MB/s, "
+              f"first chunk after {first * 1000:7.2f} ms, largest chunk {largest / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Scoring children close to a parent: delta counter updates vs. full evaluation.
+
+Run from the project folder:
+    python -m benchmarks.bench_incremental
+    python -m benchmarks.bench_incremental --batches 40 200 --changes 1 8 32
+
+``mutate`` always updates the parent's counters for the one changed slot.
+``GeneticScheduler(incremental=True)`` also derives a crossover child's counters
+from a parent's. That is off by default because uniform crossover takes about half
+the rows from each parent, so early on a child differs from both in more than
+DELTA_MAX_FRACTION of the slots and gets a full evaluation anyway; it pays off for
+crossovers of parents that are already alike (a converged population). This times
+both kinds of child scored by delta and by full evaluation, plus the per-genome
+cost of one ``evaluate_population`` call.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from genetic_scheduler import GeneticScheduler, Genome, DAYS
+from benchmarks.instances import make_instance
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / repeat
+
+
+def neighbour(scheduler, genome, changes):
+    """``genome`` with ``changes`` random non-break slots re-assigned, evaluated."""
+    other = genome
+    while scheduler.distance(genome, other) * genome.subjects.size < changes:
+        other = scheduler.mutate(other)
+    scheduler.score(other)
+    return other.freeze()
+
+
+def without_counters(genome):
+    """``genome`` without counters or score (a new Genome: it may be the parent), so ``score`` evaluates it in full."""
+    return Genome(genome.subjects, genome.rooms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", nargs="+", type=int, default=[12, 40, 200])
+    parser.add_argument("--periods", type=int, default=8)
+    parser.add_argument("--changes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'batches':>7} {'slots':>6} {'child':<18} {'full µs':>9} {'delta µs':>9} {'batched µs':>10} {'speed-up':>8}")
+    for n_batches in args.batches:
+        instance = make_instance(n_batches, periods=args.periods)
+        full, delta = (GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms,
+                                        DAYS, args.periods, seed=args.seed, incremental=incremental)
+                       for incremental in (False, True))
+        parent = full.generate_random_timetable()
+        full.score(parent)   # parents of a generation are always scored, with counters
+        others = {changes: neighbour(full, parent, changes) for changes in args.changes}
+
+        cases = [("mutated clone", lambda s: s.mutate(parent) if s is delta else without_counters(s.mutate(parent)))]
+        cases += [(f"crossover, {changes:>2} apart", lambda s, other=other: s.crossover(parent, other))
+                  for changes, other in others.items()]
+        for label, make_child in cases:
+            timings = [per_call(lambda s=s: s.score(make_child(s)), args.repeat) for s in (full, delta)]
+            children = [make_child(full).freeze() for _ in range(100)]
+            batched = per_call(lambda: full.evaluate_population(children), max(1, args.repeat // 50)) / 100
+            print(f"{n_batches:>7} {parent.subjects.size:>6} {label:<18} {timings[0]:>9.1f} {timings[1]:>9.1f} "
+                  f"{batched:>10.1f} {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-generation cost of the GA operators: dict + deepcopy vs. array genomes.
+
+Run from the project folder:
+    python -m benchmarks.bench_operators --batches 40 --population 200
+"""
+import argparse
+import copy
+import random
+import time
+
+from genetic_scheduler import GeneticScheduler, DAYS
+from benchmarks.instances import make_entities
+
+
+# ---------- PREVIOUS IMPLEMENTATION (dict slots + copy.deepcopy) ----------
+def legacy_crossover(scheduler, parent1, parent2):
+    child = {}
+    for batch in parent1:
+        child[batch] = {}
+        for day in scheduler.days:
+            source = parent1 if random.random() < 0.5 else parent2
+            child[batch][day] = copy.deepcopy(source[batch][day])
+    return child
+
+
+def legacy_mutate(scheduler, timetable):
+    mutated = copy.deepcopy(timetable)
+    batch = random.choice(list(mutated.keys()))
+    day = random.choice(scheduler.days)
+    period_index = random.randint(0, scheduler.periods_per_day - 1)
+    if mutated[batch][day][period_index]["subject"] == "BREAK":
+        return mutated
+    subj = random.choice(scheduler.subjects)
+    mutated[batch][day][period_index] = {
+        "subject": subj, "faculty": subj.faculty, "batch": batch,
+        "classroom": random.choice(scheduler.classrooms)
+    }
+    return mutated
+
+
+def one_generation(population, size, crossover, mutate):
+    """Selection + reproduction step of ``evolve`` without the fitness ranking."""
+    survivors = population[:len(population)//4]
+    survivors += random.sample(population[len(population)//4:], len(population)//4)
+    children = []
+    while len(children) + len(survivors) < size:
+        p1, p2 = random.sample(survivors, 2)
+        child = crossover(p1, p2)
+        if random.random() < 0.2:
+            child = mutate(child)
+        children.append(child)
+    return survivors + children
+
+
+def time_generations(population, size, crossover, mutate, generations):
+    start = time.perf_counter()
+    for _ in range(generations):
+        population = one_generation(population, size, crossover, mutate)
+    return (time.perf_counter() - start) / generations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--subjects", type=int, default=60)
+    parser.add_argument("--faculties", type=int, default=30)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--periods", type=int, default=8)
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    subjects, faculties, batches, rooms = make_entities(args.batches, args.subjects, args.faculties, args.rooms)
+    scheduler = GeneticScheduler(subjects, faculties, batches, rooms, DAYS, args.periods, args.population)
+    scheduler.initialize_population()
+    legacy_population = [scheduler.decode(g) for g in scheduler.population]
+
+    legacy = time_generations(
+        legacy_population, args.population,
+        lambda a, b: legacy_crossover(scheduler, a, b),
+        lambda t: legacy_mutate(scheduler, t),
+        args.generations
+    )
+    current = time_generations(
+        scheduler.population, args.population,
+        lambda a, b: scheduler.crossover(a, b).freeze(),
+        scheduler.mutate,
+        args.generations
+    )
+
+    print(f"{args.batches} batches x {len(DAYS)} days x {args.periods} periods, population {args.population}")
+    print(f"dict + deepcopy : {legacy * 1000:9.2f} ms / generation")
+    print(f"array genome    : {current * 1000:9.2f} ms / generation")
+    print(f"speed-up        : {legacy / current:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Scheduler benchmark suite: every engine mode on fixed synthetic instances, as JSON.
+
+Run from the project folder:
+    python -m benchmarks.bench_scheduler --output results.json
+    python -m benchmarks.bench_scheduler --instances small medium --modes vectorized tabu --seeds 0 1 2
+
+Each (instance, mode, seed) case is run twice with the same seed: once timed, once
+under tracemalloc for peak memory (tracing slows the run, so it is kept out of the
+timings). Compare files from two versions case by case: with fixed seeds and no
+time budgets, two runs of the same version differ only in their timings.
+"""
+import argparse
+import json
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from genetic_scheduler import GeneticScheduler, DAYS
+from local_search import STRATEGIES
+from engines import CpSatEngine, GeneticEngine, cp_model
+from decompose import DecomposedEngine
+from benchmarks.instances import INSTANCES, make_instance
+
+# mode -> GeneticScheduler options; "islands" switches to run_islands, "local_search" names a strategy,
+# "parts" decomposes the problem, "engine" replaces the GA by another engine
+MODES = {
+    "full": {},
+    "incremental": {"incremental": True},
+    "vectorized": {"vectorized": True},
+    "greedy": {"vectorized": True, "greedy_ratio": 0.5},
+    "tabu": {"vectorized": True, "greedy_ratio": 0.5, "local_search": "tabu"},
+    "annealing": {"vectorized": True, "greedy_ratio": 0.5, "local_search": "annealing"},
+    "islands": {"vectorized": True, "greedy_ratio": 0.5, "islands": 4},
+    "parts": {"vectorized": True, "greedy_ratio": 0.5, "parts": 3},
+    "cpsat": {"engine": "cpsat"},   # skipped when OR-Tools is not installed
+}
+SOLVER_TIME_LIMIT = 30   # seconds; the solver runs single-threaded so its search is deterministic
+LOCAL_SEARCH_STEPS = 50   # moves per elite per generation; a step cap instead of a time budget keeps runs reproducible
+
+
+def run_case(instance, mode, seed, args):
+    """One run of ``mode``; returns the per-generation progress and the scheduler."""
+    options = dict(MODES[mode])
+    islands = options.pop("islands", None)
+    engine = options.pop("engine", None)
+    parts = options.pop("parts", None)
+    strategy = options.pop("local_search", None)
+    if strategy:
+        options["local_search"] = STRATEGIES[strategy](time_budget=None, max_steps=LOCAL_SEARCH_STEPS)
+    scheduler = GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms,
+                                 DAYS, instance.periods, args.population, seed=seed,
+                                 special_classes=instance.special_classes, **options)
+    progress = []
+    if engine == "cpsat":
+        CpSatEngine(time_limit=SOLVER_TIME_LIMIT, workers=1).solve(scheduler, on_generation=progress.append)
+    elif parts:   # in-process, so tracemalloc sees the parts too
+        DecomposedEngine(GeneticEngine(), parts, workers=1).solve(scheduler, args.generations,
+                                                                  on_generation=progress.append)
+    elif islands:
+        scheduler.run_islands(generations=args.generations, islands=islands, workers=1,
+                              on_generation=progress.append)
+    else:
+        scheduler.run(generations=args.generations, on_generation=progress.append)
+    return progress, scheduler
+
+
+def measure(name, instance, mode, seed, args):
+    progress, scheduler = run_case(instance, mode, seed, args)
+    stats = scheduler.stats
+    elapsed = stats["elapsed"] or 1e-9
+    feasible = next((p["generation"] for p in progress if p["hard_violations"] == 0), None)
+
+    tracemalloc.start()
+    try:
+        run_case(instance, mode, seed, args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "instance": name, "mode": mode, "seed": seed,
+        "generations": stats["generations"],
+        "elapsed": stats["elapsed"],
+        "ms_per_generation": round(1000 * elapsed / max(stats["generations"], 1), 3),
+        "evaluations_per_second": round(stats["fitness_evaluations"] / elapsed, 1),
+        "fitness_evaluations": stats["fitness_evaluations"],
+        "peak_memory_mb": round(peak / 2**20, 2),
+        "generations_to_feasible": feasible,
+        "best_fitness": progress[-1]["best_fitness"],
+        "hard_violations": progress[-1]["hard_violations"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", nargs="+", choices=INSTANCES, default=list(INSTANCES))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--population", type=int, default=40)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results, instances = [], {}
+    for name in args.instances:
+        instance = make_instance(**INSTANCES[name])   # instance data always uses seed 0
+        instances[name] = instance.params
+        print(f"{name}: {instance.params}")
+        for mode in args.modes:
+            if MODES[mode].get("engine") == "cpsat" and cp_model is None:
+                print(f"  {mode:<12} skipped: OR-Tools is not installed")
+                continue
+            for seed in args.seeds:
+                result = measure(name, instance, mode, seed, args)
+                results.append(result)
+                feasible = result["generations_to_feasible"]
+                print(f"  {mode:<12} seed {seed}: {result['ms_per_generation']:9.2f} ms / generation, "
+                      f"{result['evaluations_per_second']:10.0f} evals / s, {result['peak_memory_mb']:7.2f} MB peak, "
+                      f"feasible at {feasible if feasible is not None else '-':>4}, "
+                      f"best {result['best_fitness']} ({result['hard_violations']} hard)")
+
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "settings": {"population": args.population, "generations": args.generations,
+                         "local_search_steps": LOCAL_SEARCH_STEPS, "solver_time_limit": SOLVER_TIME_LIMIT},
+            "instances": instances,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Generations until the GA finds a feasible timetable: random vs. greedy seeding.
+
+Run from the project folder:
+    python -m benchmarks.bench_seeding --batches 6 --runs 5
+"""
+import argparse
+import time
+
+from genetic_scheduler import GeneticScheduler, StopPolicy, DAYS
+from benchmarks.instances import make_entities
+
+
+def generations_to_feasible(entities, args, greedy_ratio, seed):
+    """(generations, feasible, seconds) of one run that stops at the first feasible best."""
+    scheduler = GeneticScheduler(*entities, DAYS, args.periods, args.population,
+                                 vectorized=True, seed=seed, greedy_ratio=greedy_ratio)
+    start = time.perf_counter()
+    best = scheduler.run(generations=args.generations, stop=StopPolicy(target_fitness=1))
+    return scheduler.stats["generations"], scheduler.score(best) > 0, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=6)
+    parser.add_argument("--subjects", type=int, default=12)
+    parser.add_argument("--faculties", type=int, default=12)
+    parser.add_argument("--rooms", type=int, default=8)
+    parser.add_argument("--periods", type=int, default=6)
+    parser.add_argument("--population", type=int, default=40)
+    parser.add_argument("--generations", type=int, default=300)
+    parser.add_argument("--greedy-ratio", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    entities = make_entities(args.batches, args.subjects, args.faculties, args.rooms, classes_per_week=2)
+    print(f"{args.batches} batches x {len(DAYS)} days x {args.periods} periods, population {args.population}, "
+          f"{args.runs} seeds, cap {args.generations} generations")
+    for label, ratio in (("random", 0.0), (f"greedy {args.greedy_ratio:.0%}", args.greedy_ratio)):
+        runs = [generations_to_feasible(entities, args, ratio, seed) for seed in range(args.runs)]
+        feasible = [g for g, ok, _ in runs if ok]
+        mean = f"{sum(feasible) / len(feasible):7.1f}" if feasible else "      -"
+        seconds = sum(t for *_, t in runs) / len(runs)
+        print(f"{label:<12}: feasible {len(feasible)}/{len(runs)}, "
+              f"mean generations {mean}, {seconds:6.2f} s / run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Synthetic institutions for the benchmarks: plain stand-ins for the ORM rows.
+
+``make_instance`` builds a seeded, reproducible data set from a few knobs; the
+``INSTANCES`` presets are the sizes the suite tracks between versions.
+"""
+import math
+import random
+from types import SimpleNamespace
+
+from genetic_scheduler import DAYS, BREAK_SLOTS
+
+
+class Entity:
+    """Plain stand-in for an ORM row; equal by id so deep-copied keys still match."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __eq__(self, other):
+        return type(other) is Entity and other.id == self.id and other.name == self.name
+
+    def __hash__(self):
+        return hash((self.id, self.name))
+
+
+def make_entities(n_batches, n_subjects, n_faculties, n_rooms, classes_per_week=3, max_classes_per_day=4):
+    """Uniform entities: subjects dealt round-robin to faculties, every room fits every batch."""
+    faculties = [Entity(id=i + 1, name=f"Faculty {i}", max_classes_per_day=max_classes_per_day,
+                        avg_leaves_per_month=0) for i in range(n_faculties)]
+    subjects = [
+        Entity(id=i + 1, name=f"Subject {i}", course_code=f"S{i:03d}", classes_per_week=classes_per_week,
+               faculty_id=faculties[i % n_faculties].id, faculty=faculties[i % n_faculties])
+        for i in range(n_subjects)
+    ]
+    batches = [Entity(id=i + 1, name=f"Batch {i}", num_students=60) for i in range(n_batches)]
+    rooms = [Entity(id=i + 1, name=f"Room {i}", capacity=60) for i in range(n_rooms)]
+    return subjects, faculties, batches, rooms
+
+
+def make_instance(batches, tightness=0.7, subjects=None, faculties=None, rooms=None, special_classes=0,
+                  periods=6, seed=0):
+    """A seeded synthetic institution.
+
+    ``tightness`` is the share of faculties and rooms a teaching period needs: every
+    batch teaches in every non-break period, so ``batches / tightness`` faculties and
+    rooms are generated unless given. Subjects default to enough for distinct subjects
+    within a day, with weekly demand spread to fill each batch's teaching slots.
+    ``special_classes`` pins that many clash-free classes to random cells outside the
+    break periods. Returns a namespace with the four entity lists, ``special_classes``,
+    ``periods`` and ``params``.
+    """
+    if not 0 < tightness <= 1:
+        raise ValueError("tightness must be in (0, 1]")
+    rnd = random.Random(seed)
+    n_faculties = faculties or math.ceil(batches / tightness)
+    n_rooms = rooms or math.ceil(batches / tightness)
+    n_subjects = subjects or max(periods, n_faculties)
+    teaching_slots = len(DAYS) * (periods - 1)   # one break a day
+
+    faculty_rows = [Entity(id=i + 1, name=f"Faculty {i}", max_classes_per_day=periods - 1,
+                           avg_leaves_per_month=rnd.randint(0, 3)) for i in range(n_faculties)]
+    subject_rows = []
+    for i in range(n_subjects):
+        faculty = faculty_rows[i % n_faculties]
+        demand = teaching_slots // n_subjects + (i < teaching_slots % n_subjects)
+        subject_rows.append(Entity(id=i + 1, name=f"Subject {i}", course_code=f"S{i:03d}",
+                                   classes_per_week=max(1, demand), faculty_id=faculty.id, faculty=faculty))
+    batch_rows = [Entity(id=i + 1, name=f"Batch {i}", num_students=rnd.randint(30, 60)) for i in range(batches)]
+    room_rows = [Entity(id=i + 1, name=f"Room {i}", capacity=rnd.choice((40, 60, 80))) for i in range(n_rooms)]
+
+    # pins: distinct cells, and no faculty or room pinned twice in the same period
+    pins, taken = [], set()
+    cells = [(b, d, p) for b in range(batches) for d in range(len(DAYS)) for p in range(periods)
+             if p not in BREAK_SLOTS]
+    for b, d, p in rnd.sample(cells, min(special_classes, len(cells))):
+        options = [(s, r) for s in rnd.sample(subject_rows, min(8, n_subjects))
+                   for r in rnd.sample(room_rows, min(4, n_rooms))
+                   if ("faculty", s.faculty_id, d, p) not in taken and ("room", r.id, d, p) not in taken
+                   and ("subject", b, d, s.id) not in taken]
+        if not options:
+            continue
+        subject, room = options[0]
+        taken.update({("faculty", subject.faculty_id, d, p), ("room", room.id, d, p), ("subject", b, d, subject.id)})
+        pins.append(Entity(id=len(pins) + 1, name=f"Special {len(pins)}", subject_id=subject.id,
+                           batch_id=batch_rows[b].id, room_id=room.id, day=DAYS[d], period=p + 1))
+
+    return SimpleNamespace(
+        subjects=subject_rows, faculties=faculty_rows, batches=batch_rows, classrooms=room_rows,
+        special_classes=pins, periods=periods,
+        params={"batches": batches, "subjects": n_subjects, "faculties": n_faculties, "rooms": n_rooms,
+                "special_classes": len(pins), "periods": periods, "tightness": tightness, "seed": seed},
+    )
+
+
+# Sizes tracked by bench_scheduler; keep them fixed so results compare across versions
+INSTANCES = {
+    "small": dict(batches=4, tightness=0.5, special_classes=2),
+    "medium": dict(batches=12, tightness=0.7, special_classes=8),
+    "large": dict(batches=30, tightness=0.8, special_classes=20, periods=8),
+}
@@ -11,3 +11,31 @@ DB_PATH = os.path.join(BASE_DIR, "timetable.db")
 
 # If in future you want to swap DB engines, you can just update this variable
 SQLALCHEMY_DATABASE_URI = f"sqlite:///{DB_PATH}"
+
+# Set on every new SQLite connection: WAL lets readers work during long writes (bulk
+# imports, saving runs), and writers wait for a lock instead of failing at once
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",   # safe with WAL; fsync at checkpoints instead of every commit
+    "busy_timeout": 5000,      # ms
+    "cache_size": -16000,      # KiB (negative = size, not pages)
+    "temp_store": "MEMORY",
+}
+
+# Genetic algorithm: island model (GA_ISLANDS > 1 evolves that many populations in parallel)
+GA_ISLANDS = int(os.environ.get("GA_ISLANDS", 1))
+GA_WORKERS = int(os.environ.get("GA_WORKERS", os.cpu_count() or 1))
+
+# Exact solver engine (engine="cpsat", needs OR-Tools): search threads and default time limit in seconds
+SOLVER_WORKERS = int(os.environ.get("SOLVER_WORKERS", os.cpu_count() or 1))
+SOLVER_TIME_LIMIT = float(os.environ.get("SOLVER_TIME_LIMIT", 60))
+
+# Background generation jobs: how many GA runs may execute at the same time
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", 2))
+
+# Cached entity snapshot (snapshot.py): seconds before it is reloaded even without a write from
+# this process, so changes made by other processes show up (0 = only this process's writes reload it)
+SNAPSHOT_MAX_AGE = float(os.environ.get("SNAPSHOT_MAX_AGE", 60)) or None
+
+# Rendered timetable pages kept in memory (least recently used runs are re-rendered from the DB)
+RUN_CACHE_SIZE = int(os.environ.get("RUN_CACHE_SIZE", 32))
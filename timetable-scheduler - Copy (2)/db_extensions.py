@@ -1,4 +1,42 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+
+from config import SQLITE_PRAGMAS
 
 # Create db instance here
 db = SQLAlchemy()
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply config.SQLITE_PRAGMAS to each new SQLite connection (other databases are left alone)."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_schema():
+    """Create missing tables, then upgrade the existing ones; safe to run on every start (needs an app context)."""
+    db.create_all()
+    upgrade_schema()
+
+
+def upgrade_schema():
+    """Add columns and indexes that models gained after their table was created (create_all never alters tables)."""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
@@ -0,0 +1,155 @@
+# decompose.py
+# Split one scheduling problem into parts that are solved independently (in worker
+# processes) and merged. Any batch may take any subject and room, so batches never
+# fall into disconnected groups by themselves; instead each part gets a group of
+# batches plus fixed interface slots: every (day, period) of every faculty and room
+# belongs to exactly one part, so the merged timetable cannot clash across parts.
+import bisect
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from genetic_scheduler import GeneticScheduler, Genome, PROCESS_CONTEXT
+from engines import GeneticEngine
+
+
+def batch_groups(scheduler, parts):
+    """Batch indexes split into ``parts`` contiguous, near-equal groups (ids of one department are usually adjacent)."""
+    return [group.tolist() for group in np.array_split(np.arange(len(scheduler.batches)), parts) if len(group)]
+
+
+def interface_slots(n_items, sizes, n_days, n_periods, pinned=()):
+    """Owning part of each (item, day, period), shape (items, days, periods).
+
+    At every slot the items are dealt to the parts in proportion to ``sizes`` (their
+    batch counts), rotating by one item per slot so every faculty or room serves every
+    part during the week. ``pinned`` ``(item, day, period, part)`` entries (special
+    classes) override the rotation.
+    """
+    total = sum(sizes)
+    bounds = [n_items * sum(sizes[:i + 1]) / total for i in range(len(sizes) - 1)]
+    owner = np.empty((n_items, n_days, n_periods), dtype=np.intp)
+    for t in range(n_days * n_periods):
+        d, p = divmod(t, n_periods)
+        for i in range(n_items):
+            owner[i, d, p] = bisect.bisect_right(bounds, (i + t) % n_items)
+    for i, d, p, part in pinned:
+        owner[i, d, p] = part
+    return owner
+
+
+def split(scheduler, parts):
+    """``(batch indexes, part scheduler)`` per part, each with the slots of other parts reserved."""
+    groups = batch_groups(scheduler, min(parts, len(scheduler.batches), len(scheduler.faculties),
+                                         len(scheduler.classrooms)))
+    part_of = {b: k for k, group in enumerate(groups) for b in group}
+    n_days, n_periods = len(scheduler.days), scheduler.periods_per_day
+    sizes = [len(group) for group in groups]
+    faculty_owner = interface_slots(len(scheduler.faculties), sizes, n_days, n_periods,
+                                    [(int(scheduler.subject_faculty[s]), d, p, part_of[b])
+                                     for b, d, p, s, _ in scheduler.pins])
+    room_owner = interface_slots(len(scheduler.classrooms), sizes, n_days, n_periods,
+                                 [(r, d, p, part_of[b]) for b, d, p, _, r in scheduler.pins])
+
+    seeds = np.random.SeedSequence(scheduler.seed).spawn(len(groups))
+    result = []
+    for k, (group, seq) in enumerate(zip(groups, seeds)):
+        batches = [scheduler.batches[b] for b in group]
+        batch_ids = {batch.id for batch in batches}
+        result.append((group, GeneticScheduler(
+            scheduler.subjects, scheduler.faculties, batches, scheduler.classrooms, scheduler.days,
+            scheduler.periods_per_day, scheduler.population_size, incremental=scheduler.incremental,
+            vectorized=scheduler.vectorized, seed=int(seq.generate_state(1)[0]), greedy_ratio=scheduler.greedy_ratio,
+            local_search=scheduler.local_search, niche_radius=scheduler.niche_radius, penalties=scheduler.penalties,
+            special_classes=[sc for sc in scheduler.special_classes if sc.batch_id in batch_ids],
+            reserved=(faculty_owner != k, room_owner != k))))
+    return result
+
+
+def _solve_part(engine, scheduler, generations, stop):
+    """Worker entry point: best genome of one part and the part's run stats (plus its hard violations)."""
+    best = engine.solve(scheduler, generations, stop=stop, top_k=1)[0]
+    scheduler.score(best)
+    return best, {**scheduler.stats, "hard_violations": scheduler._state(best).hard_violations}
+
+
+class DecomposedEngine:
+    """Solve ``parts`` batch groups with ``engine`` in ``workers`` processes, then merge them.
+
+    Each part runs the job's stopping rules on its own. ``on_generation`` gets the
+    combined progress after each part; a stop request solves the parts not started yet
+    without evolving them (their seeded initial population only). The merged timetable
+    is checked for clashes across parts, counted in ``stats["cross_part_clashes"]``.
+    Returns a single timetable.
+    """
+    name = "decomposed"
+
+    def __init__(self, engine, parts=2, workers=None):
+        self.engine = engine
+        self.parts = parts
+        self.workers = workers
+
+    def solve(self, scheduler, generations, on_generation=None, stop=None, top_k=1):
+        scheduler.stats = scheduler._new_stats()
+        start = time.perf_counter()
+        parts = split(scheduler, self.parts)
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=PROCESS_CONTEXT) if self.workers != 1 else None
+        results, stopped = {}, False
+        try:
+            futures = [(k, pool.submit(_solve_part, self.engine, part, generations, stop)) if pool else (k, None)
+                       for k, (_, part) in enumerate(parts)]
+            for k, future in futures:
+                if stopped and (future is None or future.cancel()):
+                    results[k] = _solve_part(GeneticEngine(), parts[k][1], 0, None)
+                else:
+                    results[k] = future.result() if future else _solve_part(self.engine, parts[k][1], generations, stop)
+                progress = self._progress(scheduler, results, len(parts), generations, start)
+                if on_generation and not stopped and on_generation(progress):
+                    stopped = True
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        subjects = np.empty(scheduler.shape, dtype=np.int16)
+        rooms = np.empty(scheduler.shape, dtype=np.int16)
+        for k, (group, _) in enumerate(parts):
+            genome, _ = results[k]
+            subjects[group], rooms[group] = genome.subjects, genome.rooms
+        merged = Genome(subjects, rooms).freeze()
+
+        # cross-part check: a clash whose classes come from more than one part
+        part_of = np.empty(len(scheduler.batches), dtype=np.intp)
+        for k, (group, _) in enumerate(parts):
+            part_of[group] = k
+        occupancy = scheduler.occupancy(merged)
+        faculty = np.where(subjects >= 0, scheduler.subject_faculty[np.maximum(subjects, 0)], -1)
+        owners = {"faculty": faculty, "room": np.where(subjects >= 0, rooms, -1)}
+        cross = sum(1 for kind, i, d, p, _ in occupancy.clashes()
+                    if len(set(part_of[owners[kind][:, d, p] == i].tolist())) > 1)
+
+        stats = scheduler.stats
+        for _, part_stats in results.values():
+            stats["generations"] = max(stats["generations"], part_stats["generations"])
+            stats["fitness_evaluations"] += part_stats["fitness_evaluations"]
+            stats["full_evaluations"] += part_stats["full_evaluations"]
+        stats["elapsed"] = round(time.perf_counter() - start, 3)
+        reasons = Counter(part_stats["stopped_by"] for _, part_stats in results.values())
+        stats["stopped_by"] = "callback" if stopped else reasons.most_common(1)[0][0]
+        stats["parts"] = len(parts)
+        stats["cross_part_clashes"] = cross
+        return [merged]
+
+    @staticmethod
+    def _progress(scheduler, results, n_parts, generations, start):
+        """Progress stats over the parts finished so far (fitness adds up their penalties)."""
+        base = scheduler.penalties.base
+        fitness = base - sum(base - genome.fitness for genome, _ in results.values())
+        return {
+            "generation": generations * len(results) // n_parts,
+            "best_fitness": fitness,
+            "mean_fitness": fitness,
+            "hard_violations": sum(part_stats["hard_violations"] for _, part_stats in results.values()),
+            "elapsed": round(time.perf_counter() - start, 3),
+        }
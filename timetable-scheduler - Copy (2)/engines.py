@@ -0,0 +1,176 @@
+# engines.py
+# Interchangeable timetable engines. Each one solves the problem described by a
+# GeneticScheduler (entities, pins, penalties) and returns Genomes, so rendering,
+# scoring and saving runs are the same whichever engine produced the timetable.
+import queue
+import threading
+import time
+
+import numpy as np
+
+from genetic_scheduler import Genome, BREAK
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:   # optional: only the "cpsat" engine needs OR-Tools
+    cp_model = None
+
+
+class GeneticEngine:
+    """The genetic algorithm: ``run``, or ``run_islands`` when ``islands`` > 1."""
+    name = "genetic"
+
+    def __init__(self, islands=1, workers=1):
+        self.islands = islands
+        self.workers = workers
+
+    def solve(self, scheduler, generations, on_generation=None, stop=None, top_k=1):
+        if self.islands > 1:
+            return scheduler.run_islands(generations=generations, islands=self.islands, workers=self.workers,
+                                         on_generation=on_generation, stop=stop, top_k=top_k)
+        return scheduler.run(generations=generations, on_generation=on_generation, stop=stop, top_k=top_k)
+
+
+class CpSatEngine:
+    """Exact model solved by OR-Tools CP-SAT with ``workers`` search threads.
+
+    Hard constraints (no faculty/room double booking or reserved slot used, no subject
+    twice a day, one break per batch and day, special classes fixed) are model
+    constraints; the objective is the number of misplaced breaks, so every solution is
+    clash-free and the best one also has the best ``GeneticScheduler.score``. The
+    search stops at a proven optimum, after ``time_limit`` seconds (keeping the best
+    incumbent) or when ``on_generation`` / ``stop`` ask it to. Returns one timetable.
+    """
+    name = "cpsat"
+
+    def __init__(self, time_limit=60, workers=8):
+        if cp_model is None:
+            raise ValueError("❌ The cpsat engine needs OR-Tools (pip install ortools)")
+        self.time_limit = time_limit
+        self.workers = workers
+
+    def build(self, scheduler):
+        """``(model, lessons, rooms, breaks)``: the model and its cell -> variable maps."""
+        model = cp_model.CpModel()
+        n_batches, n_days, n_periods = scheduler.shape
+        n_subjects, n_rooms = len(scheduler.subjects), len(scheduler.classrooms)
+        pinned = {(b, d, p): (s, r) for b, d, p, s, r in scheduler.pins}
+
+        lessons, rooms, breaks = {}, {}, {}   # (b, d, p, s) / (b, d, p, r) / (b, d, p) -> BoolVar
+        for b in range(n_batches):
+            for d in range(n_days):
+                for p in range(n_periods):
+                    cell = (b, d, p)
+                    breaks[cell] = model.new_bool_var(f"break_{b}_{d}_{p}")
+                    for s in range(n_subjects):
+                        lessons[cell + (s,)] = model.new_bool_var(f"lesson_{b}_{d}_{p}_{s}")
+                    for r in range(n_rooms):
+                        rooms[cell + (r,)] = model.new_bool_var(f"room_{b}_{d}_{p}_{r}")
+                    # a cell holds one subject in one room, or the break (which has no room)
+                    model.add_exactly_one([breaks[cell]] + [lessons[cell + (s,)] for s in range(n_subjects)])
+                    model.add(sum(rooms[cell + (r,)] for r in range(n_rooms)) + breaks[cell] == 1)
+                    if cell in pinned:
+                        s, r = pinned[cell]
+                        model.add(lessons[cell + (s,)] == 1)
+                        model.add(rooms[cell + (r,)] == 1)
+                model.add_exactly_one(breaks[b, d, p] for p in range(n_periods))
+                for s in range(n_subjects):
+                    model.add_at_most_one(lessons[b, d, p, s] for p in range(n_periods))
+
+        taught_by = [[] for _ in scheduler.faculties]
+        for s, f in enumerate(scheduler.subject_faculty.tolist()):
+            taught_by[f].append(s)
+        faculty_reserved = scheduler.reserved_faculty.reshape(-1, n_days, n_periods)
+        room_reserved = scheduler.reserved_room.reshape(-1, n_days, n_periods)
+        for d in range(n_days):
+            for p in range(n_periods):
+                for f, subjects in enumerate(taught_by):
+                    taught = [lessons[b, d, p, s] for b in range(n_batches) for s in subjects]
+                    if taught and faculty_reserved[f, d, p]:
+                        model.add(sum(taught) == 0)
+                    elif taught:
+                        model.add_at_most_one(taught)
+                for r in range(n_rooms):
+                    used = [rooms[b, d, p, r] for b in range(n_batches)]
+                    if room_reserved[r, d, p]:
+                        model.add(sum(used) == 0)
+                    else:
+                        model.add_at_most_one(used)
+
+        # misplaced breaks are the only soft constraint, so their count is the objective
+        model.minimize(sum(breaks[b, d, p] for b in range(n_batches) for d in range(n_days)
+                           for p in scheduler.bad_break_periods))
+        return model, lessons, rooms, breaks
+
+    def solve(self, scheduler, generations=None, on_generation=None, stop=None, top_k=1):
+        scheduler.stats = scheduler._new_stats()
+        start = time.perf_counter()
+        model, lessons, rooms, breaks = self.build(scheduler)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = float(self.time_limit)
+        solver.parameters.num_workers = self.workers
+        solver.parameters.random_seed = (scheduler.seed or 0) % 2**31   # CP-SAT takes an int32
+
+        # the solver reports incumbents from its own threads; they are handed over through
+        # a queue so on_generation runs in the caller's thread, as it does for the GA
+        updates, result = queue.Queue(), {}
+
+        def search():
+            try:
+                result["status"] = solver.solve(model, _Incumbents(scheduler, start, updates.put))
+            finally:
+                updates.put(None)
+
+        if stop:
+            stop.reset()
+        stopped_by = None
+        threading.Thread(target=search, name="cp-sat", daemon=True).start()
+        for progress in iter(updates.get, None):
+            if stopped_by:
+                continue   # stop_search was called; drain until the solver returns
+            if on_generation and on_generation(progress):
+                stopped_by = "callback"
+            elif stop:
+                stopped_by = stop.check(progress, scheduler.stats["fitness_evaluations"])
+            if stopped_by:
+                solver.stop_search()
+
+        status = result.get("status", cp_model.UNKNOWN)
+        scheduler.stats["elapsed"] = round(time.perf_counter() - start, 3)
+        if status == cp_model.INFEASIBLE:
+            raise ValueError("❌ No clash-free timetable exists for this data (proven by the CP-SAT solver)")
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise ValueError(f"❌ The CP-SAT solver found no timetable within {self.time_limit} s")
+        scheduler.stats["stopped_by"] = stopped_by or ("optimal" if status == cp_model.OPTIMAL else "time_limit")
+
+        subjects = np.full(scheduler.shape, BREAK, dtype=np.int16)
+        room_of = np.full(scheduler.shape, BREAK, dtype=np.int16)
+        for (b, d, p, s), var in lessons.items():
+            if solver.boolean_value(var):
+                subjects[b, d, p] = s
+        for (b, d, p, r), var in rooms.items():
+            if solver.boolean_value(var):
+                room_of[b, d, p] = r
+        return [Genome(subjects, room_of).freeze()]
+
+
+class _Incumbents(cp_model.CpSolverSolutionCallback if cp_model else object):
+    """Passes each improving solution to ``report`` as GA-style progress stats."""
+
+    def __init__(self, scheduler, start, report):
+        super().__init__()
+        self.scheduler = scheduler
+        self.start = start
+        self.report = report
+
+    def on_solution_callback(self):
+        stats = self.scheduler.stats
+        stats["generations"] += 1   # one "generation" per improving solution
+        stats["fitness_evaluations"] += 1
+        fitness = self.scheduler.penalties.score(0, 0, 0, 0, round(self.objective_value))
+        self.report({"generation": stats["generations"], "best_fitness": fitness, "mean_fitness": fitness,
+                     "hard_violations": 0, "elapsed": round(time.perf_counter() - self.start, 3)})
+
+
+ENGINES = {"genetic": GeneticEngine, "cpsat": CpSatEngine}
@@ -0,0 +1,178 @@
+# exporters.py
+# Streaming exports of saved timetable runs. Each exporter is a generator over
+# Timetable rows (anything with batch_id / day / period / subject_id / faculty_id /
+# classroom_id attributes) that yields the document in small chunks, so a route
+# can stream it without ever holding the whole file in memory. Repeated fragments
+# (a cell, an event's times) are formatted once and reused.
+import csv
+import io
+from datetime import timedelta
+from html import escape
+
+from genetic_scheduler import ALL_DAYS, OFF_DAYS, PERIOD_TIMES, TIMETABLE_CSS
+
+# What a grid is drawn for, per filter column: (heading, cell lines shown besides the subject)
+GROUPS = {
+    "batch_id": ("Batch", ("faculty", "classroom")),
+    "faculty_id": ("Faculty", ("batch", "classroom")),
+    "classroom_id": ("Room", ("batch", "faculty")),
+}
+FIRST_PERIOD_HOUR = 7   # PERIOD_TIMES[1] starts at 7:00, each period lasts an hour
+ROWS_PER_CHUNK = 200    # CSV lines / calendar events per yielded chunk
+
+
+def _resolve(row, snapshot):
+    """Records behind a row's ids (None for rows whose entities were deleted since)."""
+    return {
+        "batch": snapshot.batches_by_id.get(row.batch_id),
+        "subject": snapshot.subjects_by_id.get(row.subject_id),
+        "faculty": snapshot.faculties_by_id.get(row.faculty_id),
+        "classroom": snapshot.classrooms_by_id.get(row.classroom_id),
+    }
+
+
+def _name(record):
+    return record.name if record is not None else "?"
+
+
+# ---------- HTML ----------
+def iter_html(rows, snapshot, periods_per_day, group_by="batch_id", title="Timetables"):
+    """One timetable grid per ``group_by`` value; rows must come grouped by that column.
+
+    Only the current group's cells are held (at most days x periods rows) and each grid
+    is yielded as one chunk. Empty cells are breaks in a batch grid and free periods in
+    a faculty or room grid.
+    """
+    heading, details = GROUPS[group_by]
+    empty = "<td class='break'> BREAK</td>" if group_by == "batch_id" else "<td></td>"
+    records = {"batch_id": snapshot.batches_by_id, "faculty_id": snapshot.faculties_by_id,
+               "classroom_id": snapshot.classrooms_by_id}[group_by]
+    subjects = {sid: f"<b>{escape(s.course_code)} {escape(s.name)}</b>" for sid, s in snapshot.subjects_by_id.items()}
+    names = {field: {i: escape(record.name) for i, record in by_id.items()}
+             for field, by_id in (("batch", snapshot.batches_by_id), ("faculty", snapshot.faculties_by_id),
+                                  ("classroom", snapshot.classrooms_by_id))}
+    (first_id, first_names), (second_id, second_names) = ((f"{field}_id", names[field]) for field in details)
+
+    def cell(row):   # entity names are escaped once above, not per cell
+        return (f"<td>{subjects.get(row.subject_id, '<b>?</b>')}<br>{first_names.get(getattr(row, first_id), '?')}"
+                f"<br>{second_names.get(getattr(row, second_id), '?')}</td>")
+    header = "<tr><th>Day</th>" + "".join(
+        f"<th>Period {i+1}<br>{PERIOD_TIMES[i+1]}</th>" for i in range(periods_per_day)) + "</tr>"
+    off_row = "".join("<td class='off'>OFF</td>" for _ in range(periods_per_day))
+
+    def grid(key, cells):
+        parts = [f"<h2> {heading}: {escape(_name(records.get(key)))}</h2><table>{header}"]
+        for day in ALL_DAYS:   # include off-days
+            if day in OFF_DAYS:
+                parts.append(f"<tr><td>{day}</td>{off_row}</tr>")
+                continue
+            parts.append(f"<tr><td>{day}</td>")
+            parts.extend(cells.get((day, period), empty) for period in range(1, periods_per_day + 1))
+            parts.append("</tr>")
+        parts.append("</table>")
+        return "".join(parts)
+
+    yield (f"<html><head><meta charset='utf-8'><title>{escape(title)}</title>"
+           f"<style>{TIMETABLE_CSS}</style></head><body><h1>{escape(title)}</h1>")
+    key, cells = None, {}
+    for row in rows:
+        row_key = getattr(row, group_by)
+        if row_key != key and cells:
+            yield grid(key, cells)
+            cells = {}
+        key = row_key
+        cells[row.day, row.period] = cell(row)
+    if cells:
+        yield grid(key, cells)
+    yield "</body></html>"
+
+
+# ---------- CSV ----------
+CSV_COLUMNS = ["day", "period", "time", "batch", "course_code", "subject", "faculty", "room"]
+
+
+def iter_csv(rows, snapshot):
+    """One CSV line per taught slot, in row order, ``ROWS_PER_CHUNK`` lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    for n, row in enumerate(rows, 1):
+        r = _resolve(row, snapshot)
+        subject = r["subject"]
+        writer.writerow([row.day, row.period, PERIOD_TIMES.get(row.period, ""), _name(r["batch"]),
+                         subject.course_code if subject else "", _name(subject),
+                         _name(r["faculty"]), _name(r["classroom"])])
+        if n % ROWS_PER_CHUNK == 0:
+            yield flush()
+    yield flush()
+
+
+# ---------- iCalendar ----------
+def _ics_text(value):
+    """Escape a TEXT value (RFC 5545 3.3.11)."""
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(line):
+    """Fold a content line at 75 octets (continuation lines start with a space)."""
+    if len(line) <= 18:   # even all 4-byte characters fit
+        return line + "\r\n"
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    chunks, start = [], 0
+    while start < len(data):
+        end = min(start + (75 if not chunks else 74), len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:   # don't split a UTF-8 sequence
+            end -= 1
+        chunks.append(data[start:end].decode("utf-8"))
+        start = end
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def iter_ics(rows, snapshot, week_of, uid_prefix, name="Timetable"):
+    """A VCALENDAR with one weekly-recurring VEVENT per taught slot.
+
+    Events start in the week containing ``week_of`` (a datetime) at floating local time.
+    """
+    monday = (week_of - timedelta(days=week_of.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    stamp = week_of.strftime("%Y%m%dT%H%M%SZ")
+    times = {}   # (day, period) -> "DTSTART:...\r\nDTEND:...\r\n"
+
+    def slot_times(day, period):
+        text = times.get((day, period))
+        if text is None:
+            start = monday + timedelta(days=ALL_DAYS.index(day), hours=FIRST_PERIOD_HOUR + period - 1)
+            text = times[day, period] = (f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n"
+                                         f"DTEND:{start + timedelta(hours=1):%Y%m%dT%H%M%S}\r\n")
+        return text
+
+    chunk = ["".join(_ics_line(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//timetable-scheduler//EN", "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_text(name)}"))]
+    for n, row in enumerate(rows):
+        uid = getattr(row, "id", n)   # stable per slot when rows come from the DB
+        r = _resolve(row, snapshot)
+        subject = r["subject"]
+        summary = f"{subject.course_code} {subject.name}" if subject else "?"
+        description = f"{_name(r['batch'])} - {_name(r['faculty'])}"
+        chunk.append(
+            f"BEGIN:VEVENT\r\nUID:{uid_prefix}-{uid}@timetable-scheduler\r\nDTSTAMP:{stamp}\r\n"
+            + slot_times(row.day, row.period) + "RRULE:FREQ=WEEKLY\r\n"
+            + _ics_line(f"SUMMARY:{_ics_text(summary)}")
+            + _ics_line(f"LOCATION:{_ics_text(_name(r['classroom']))}")
+            + _ics_line(f"DESCRIPTION:{_ics_text(description)}")
+            + "END:VEVENT\r\n")
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    chunk.append("END:VCALENDAR\r\n")
+    yield "".join(chunk)
+
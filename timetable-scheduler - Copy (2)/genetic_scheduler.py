@@ -1,12 +1,16 @@
+import multiprocessing
 import random
-import copy
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from prettytable import PrettyTable
-import os
 
 # ---------------- GLOBAL SETTINGS ----------------
 ALL_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 OFF_DAYS = ["Sunday", "Saturday"]   # ✅ fixed off-days
 DAYS = [d for d in ALL_DAYS if d not in OFF_DAYS]
+PERIODS_PER_DAY = 6   # periods the app schedules each day (PERIOD_TIMES lists more)
 
 PERIOD_TIMES = {
     1: "7:00 - 8:00",
@@ -24,8 +28,274 @@ PERIOD_TIMES = {
 }
 
 
+TIMETABLE_CSS = """
+            body { font-family: Arial, sans-serif; margin: 20px; }
+            h1 { color: #2c3e50; }
+            h2 { margin-top: 30px; color: #8e44ad; }
+            table { border-collapse: collapse; width: 100%; margin-bottom: 40px; }
+            th, td { border: 1px solid #ddd; padding: 10px; text-align: center; }
+            th { background-color: #27ae60; color: white; }
+            td.break { background-color: #f9e79f; font-weight: bold; }
+            td.off { background-color: #d5d8dc; font-style: italic; }
+"""
+
+
+BREAK = -1             # subject/room index stored in a break slot
+BREAK_SLOTS = (2, 3)   # 0-based periods the daily break may fall in
+# Worker processes are spawned, not forked: pools are created from job threads of a
+# multithreaded server, and a forked child can inherit locks held by other threads
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+DELTA_MAX_FRACTION = 0.1   # above this share of changed slots a full re-evaluation is cheaper
+DELTA_LOOP_MAX = 16        # up to this many changed slots, per-slot updates beat scatter-adds
+
+# Constraint types in FitnessState.counts order; all but the last are hard
+CONSTRAINTS = ("faculty_clash", "room_clash", "repeat", "break_count", "misplaced_break")
+HARD_CONSTRAINTS = CONSTRAINTS[:-1]
+
+
+class Genome:
+    """Compact candidate timetable.
+
+    ``subjects[b, d, p]`` indexes ``GeneticScheduler.subjects`` and ``rooms[b, d, p]``
+    indexes ``GeneticScheduler.classrooms`` for batch ``b``, day ``d`` and period ``p``.
+    Break slots hold ``BREAK`` in both arrays.
+
+    Genomes in a population are frozen (read-only arrays), so survivors and parents
+    can be shared between generations and children without defensive copies.
+    ``state`` holds the genome's FitnessState once it has been evaluated and
+    ``fitness`` caches its score; operators always hand back a new genome (or one
+    they just reset), so a cached score is never stale.
+    """
+    __slots__ = ("subjects", "rooms", "state", "fitness")
+
+    def __init__(self, subjects, rooms, state=None):
+        self.subjects = subjects
+        self.rooms = rooms
+        self.state = state
+        self.fitness = None
+
+    @property
+    def frozen(self):
+        return not self.subjects.flags.writeable
+
+    def freeze(self):
+        self.subjects.flags.writeable = False
+        self.rooms.flags.writeable = False
+        return self
+
+    def __reduce__(self):
+        # pickled for island workers: arrays + cached score only, counters are rebuilt on demand
+        return _restore_genome, (self.subjects, self.rooms, self.fitness)
+
+
+def _restore_genome(subjects, rooms, fitness):
+    genome = Genome(subjects, rooms).freeze()
+    genome.fitness = fitness
+    return genome
+
+
+class FitnessState:
+    """Per-constraint counters behind a genome's score.
+
+    ``faculty_busy`` / ``room_busy`` count classes per (faculty|room, day, period) and
+    ``subject_day`` counts classes per (batch, day, subject), all as flat arrays. The
+    violation totals are kept next to them so a changed slot only adjusts the counters
+    it touches instead of rescanning the timetable.
+    """
+    __slots__ = ("faculty_busy", "room_busy", "subject_day",
+                 "faculty_clashes", "room_clashes", "repeats", "break_errors", "misplaced_breaks")
+
+    def __init__(self, faculty_busy, room_busy, subject_day):
+        self.faculty_busy = faculty_busy
+        self.room_busy = room_busy
+        self.subject_day = subject_day
+        self.faculty_clashes = _excess(faculty_busy)
+        self.room_clashes = _excess(room_busy)
+        self.repeats = _excess(subject_day)
+        self.break_errors = 0       # (batch, day) rows without exactly one break
+        self.misplaced_breaks = 0   # breaks outside BREAK_SLOTS
+
+    @property
+    def hard_violations(self):
+        return self.faculty_clashes + self.room_clashes + self.repeats + self.break_errors
+
+    @property
+    def counts(self):
+        """Violations per constraint type, in ``CONSTRAINTS`` order."""
+        return self.faculty_clashes, self.room_clashes, self.repeats, self.break_errors, self.misplaced_breaks
+
+    def copy(self):
+        state = FitnessState.__new__(FitnessState)
+        for name in FitnessState.__slots__[:3]:
+            setattr(state, name, getattr(self, name).copy())
+        for name in FitnessState.__slots__[3:]:
+            setattr(state, name, getattr(self, name))
+        return state
+
+
+def _excess(counts):
+    """Number of double bookings in a counter array (every count above 1)."""
+    return int(np.maximum(counts - 1, 0).sum())
+
+
+def _book(counts, key, step):
+    """Add ``step`` (+1 / -1) bookings at ``key`` and return the change in double bookings."""
+    counts[key] += step
+    return step if counts[key] >= (2 if step > 0 else 1) else 0
+
+
+def _rebook(counts, removed, added):
+    """Move bookings from ``removed`` to ``added`` keys (scatter-adds); returns the change in double bookings."""
+    touched = np.unique(np.concatenate((removed, added)))
+    before = np.maximum(counts[touched] - 1, 0).sum()
+    np.subtract.at(counts, removed, 1)
+    np.add.at(counts, added, 1)
+    return int(np.maximum(counts[touched] - 1, 0).sum() - before)
+
+
+class Penalties:
+    """Weight of one violation of each constraint type: ``score = base - weighted violations``.
+
+    ``hard`` / ``soft`` set the default weight of the hard types and of misplaced
+    breaks; single types can be overridden by name (e.g. ``room_clash=50``). With the
+    defaults a feasible genome scores 100 - 5 per misplaced break and an infeasible
+    one at most 0, but fewer hard violations still rank higher.
+    """
+
+    def __init__(self, hard=100, soft=5, base=100, **weights):
+        unknown = set(weights) - set(CONSTRAINTS)
+        if unknown:
+            raise ValueError(f"Unknown constraint type(s): {', '.join(sorted(unknown))}")
+        self.base = base
+        self.weights = tuple(weights.get(name, hard if name in HARD_CONSTRAINTS else soft) for name in CONSTRAINTS)
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Penalties from job settings (``hard_weight`` / ``soft_weight``, defaults when missing)."""
+        weights = {key: settings[name] for key, name in (("hard", "hard_weight"), ("soft", "soft_weight"))
+                   if settings.get(name) is not None}
+        return cls(**weights)
+
+    def penalty(self, faculty_clashes, room_clashes, repeats, break_errors, misplaced_breaks):
+        """Weighted sum of violation counts (ints or same-shaped arrays)."""
+        w_faculty, w_room, w_repeat, w_break, w_misplaced = self.weights
+        return (w_faculty * faculty_clashes + w_room * room_clashes + w_repeat * repeats
+                + w_break * break_errors + w_misplaced * misplaced_breaks)
+
+    def score(self, *counts):
+        return self.base - self.penalty(*counts)
+
+
+# One violation found by GeneticScheduler.violations; ids and day name as in ``assignments``,
+# None where a field does not apply. ``count`` is the bookings / classes / breaks involved.
+Violation = namedtuple("Violation", "kind hard batch_id day period faculty_id subject_id classroom_id count")
+
+
+class OccupancyIndex:
+    """Who is busy when, across all batches.
+
+    ``faculty_bits[d][p]`` / ``room_bits[d][p]`` are bitmaps (Python ints) of the
+    faculty / room indices booked at day ``d``, period ``p`` in any batch, so a
+    free-check is one shift and a mask. ``faculty_count`` / ``room_count`` hold the
+    number of bookings per (index, day, period) so releasing one side of a double
+    booking keeps the bit set, and ``faculty_load`` counts classes per (faculty, day).
+    Built in one pass (``GeneticScheduler.occupancy``) and kept current with
+    ``book`` / ``release``.
+    """
+    __slots__ = ("faculty_bits", "room_bits", "faculty_count", "room_count", "faculty_load")
+
+    def __init__(self, faculty_count, room_count):
+        self.faculty_count = faculty_count
+        self.room_count = room_count
+        self.faculty_load = faculty_count.sum(axis=2)
+        self.faculty_bits = _bitmaps(faculty_count)
+        self.room_bits = _bitmaps(room_count)
+
+    @classmethod
+    def empty(cls, n_faculties, n_rooms, n_days, n_periods):
+        return cls(np.zeros((n_faculties, n_days, n_periods), dtype=np.int16),
+                   np.zeros((n_rooms, n_days, n_periods), dtype=np.int16))
+
+    def faculty_free(self, faculty, d, p):
+        return not self.faculty_bits[d][p] >> faculty & 1
+
+    def room_free(self, room, d, p):
+        return not self.room_bits[d][p] >> room & 1
+
+    def book(self, d, p, faculty, room, step=1):
+        """Add ``step`` bookings of ``faculty`` and ``room`` at (d, p); either may be None."""
+        for bits, counts, i in ((self.faculty_bits, self.faculty_count, faculty),
+                                (self.room_bits, self.room_count, room)):
+            if i is None:
+                continue
+            counts[i, d, p] += step
+            if counts[i, d, p] > 0:
+                bits[d][p] |= 1 << i
+            else:
+                bits[d][p] &= ~(1 << i)
+        if faculty is not None:
+            self.faculty_load[faculty, d] += step
+
+    def release(self, d, p, faculty, room):
+        self.book(d, p, faculty, room, -1)
+
+    def clashes(self):
+        """``(kind, index, day, period, bookings)`` for every double booking, kind "faculty" or "room"."""
+        found = []
+        for kind, counts in (("faculty", self.faculty_count), ("room", self.room_count)):
+            for i, d, p in zip(*(axis.tolist() for axis in np.nonzero(counts > 1))):
+                found.append((kind, i, d, p, int(counts[i, d, p])))
+        return found
+
+
+def _bitmaps(counts):
+    """[day][period] bitmaps of the indices with a non-zero count in an (index, day, period) array."""
+    _, n_days, n_periods = counts.shape
+    bits = [[0] * n_periods for _ in range(n_days)]
+    for i, d, p in zip(*(axis.tolist() for axis in np.nonzero(counts))):
+        bits[d][p] |= 1 << i
+    return bits
+
+
+class StopPolicy:
+    """Stopping rules for a GA run; rules left as None are off and the first one met ends the run.
+
+    target_fitness: best fitness reached; stagnation: generations without the best improving;
+    time_limit: seconds spent evolving; max_evaluations: fitness evaluations spent.
+    """
+
+    def __init__(self, target_fitness=None, stagnation=None, time_limit=None, max_evaluations=None):
+        self.target_fitness = target_fitness
+        self.stagnation = stagnation
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.reset()
+
+    def reset(self):
+        self.best = None
+        self.best_generation = 0
+
+    def check(self, progress, evaluations):
+        """Name of the rule met by this generation's progress stats, else None."""
+        if self.best is None or progress["best_fitness"] > self.best:
+            self.best, self.best_generation = progress["best_fitness"], progress["generation"]
+
+        if self.target_fitness is not None and progress["best_fitness"] >= self.target_fitness:
+            return "target_fitness"
+        if self.stagnation is not None and progress["generation"] - self.best_generation >= self.stagnation:
+            return "stagnation"
+        if self.time_limit is not None and progress["elapsed"] >= self.time_limit:
+            return "time_limit"
+        if self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            return "max_evaluations"
+        return None
+
+
 class GeneticScheduler:
-    def __init__(self, subjects, faculties, batches, classrooms, days, periods_per_day, population_size=10):
+    def __init__(self, subjects, faculties, batches, classrooms, days, periods_per_day, population_size=10,
+                 incremental=False, vectorized=False, seed=None, greedy_ratio=0.0,
+                 local_search=None, special_classes=(), niche_radius=None, penalties=None, reserved=None):
         # Core "ingredients"
         self.subjects = subjects
         self.faculties = faculties
@@ -34,182 +304,688 @@ class GeneticScheduler:
         self.days = days
         self.periods_per_day = periods_per_day
         self.population_size = population_size
+        self.incremental = incremental   # derive crossover children's counters from a parent's (benchmarks/bench_incremental.py)
+        self.vectorized = vectorized     # score each generation's new genomes in one NumPy call
+        self.greedy_ratio = greedy_ratio # share of the initial population built by the greedy heuristic
+        self.local_search = local_search # optional local_search.LocalSearch applied to each generation's elites
+        self.niche_radius = niche_radius # clearing: genomes closer than this to a better one rank last
+        self.penalties = penalties or Penalties()   # weight of each constraint type in the score
+
+        # Seeded generators: same seed (and island count) -> same timetable
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
+
+        # ID lookup tables: genomes only hold indices into the lists above
+        self.faculty_index = {f.id: i for i, f in enumerate(faculties)}
+        self.subject_faculty = np.array([self.faculty_index[s.faculty_id] for s in subjects], dtype=np.int16)
+        self.shape = (len(batches), len(days), periods_per_day)
+        self.cells = np.indices(self.shape).reshape(3, -1)
+        self.bad_break_periods = [p for p in range(periods_per_day) if p not in BREAK_SLOTS]
+
+        # Inputs for the greedy construction heuristic
+        self.weekly_demand = [s.classes_per_week for s in subjects]
+        self.faculty_daily_limit = [f.max_classes_per_day for f in faculties]
+        self.batch_sizes = [b.num_students for b in batches]
+        self.room_capacities = [c.capacity for c in classrooms]
+
+        # Slots taken outside this timetable (other parts of a decomposed problem): flat
+        # (faculty|room, day, period) counts the counters start from, so using one is a clash
+        n_slots = len(days) * periods_per_day
+        faculty_reserved, room_reserved = reserved if reserved is not None else (None, None)
+        self.reserved_faculty = (np.zeros(len(faculties) * n_slots, dtype=np.int16) if faculty_reserved is None
+                                 else np.asarray(faculty_reserved, dtype=np.int16).ravel())
+        self.reserved_room = (np.zeros(len(classrooms) * n_slots, dtype=np.int16) if room_reserved is None
+                              else np.asarray(room_reserved, dtype=np.int16).ravel())
+
+        # Special classes are pinned genes: identical in every genome, skipped by mutation
+        self._pin(special_classes)
 
         # Store generated candidate timetables
         self.population = []
+        self.stats = self._new_stats()
+
+    def _pin(self, special_classes):
+        """Resolve SpecialClass rows to (batch, day, period) cells holding a fixed subject and room.
+
+        Rows that cannot be pinned (outside the week, referring to missing data, or on a
+        cell an earlier special class holds) are left out and listed in ``skipped_pins``
+        as ``{"id", "reason"}``, so one bad row does not block scheduling.
+        """
+        subject_index = {s.id: i for i, s in enumerate(self.subjects)}
+        batch_index = {b.id: i for i, b in enumerate(self.batches)}
+        room_index = {c.id: i for i, c in enumerate(self.classrooms)}
+
+        self.locked = np.zeros(self.shape, dtype=bool)
+        pins, pinned_classes, self.skipped_pins = [], [], []
+        for sc in special_classes:
+            if sc.day not in self.days or not 1 <= sc.period <= self.periods_per_day:
+                reason = (f"on {sc.day} period {sc.period}, outside the "
+                          f"{len(self.days)}-day x {self.periods_per_day}-period week")
+            elif not (sc.batch_id in batch_index and sc.subject_id in subject_index and sc.room_id in room_index):
+                reason = "refers to a missing subject, batch or room"
+            elif self.locked[batch_index[sc.batch_id], self.days.index(sc.day), sc.period - 1]:
+                reason = "overlaps another special class"
+            else:
+                cell = (batch_index[sc.batch_id], self.days.index(sc.day), sc.period - 1)
+                pins.append(cell + (subject_index[sc.subject_id], room_index[sc.room_id]))
+                pinned_classes.append(sc)
+                self.locked[cell] = True
+                continue
+            self.skipped_pins.append({"id": sc.id, "reason": reason})
+
+        self.special_classes = tuple(pinned_classes)
+        self.pins = pins
+        pinned = np.array(pins, dtype=np.intp).reshape(-1, 5).T
+        self.pin_cells, self.pin_subjects, self.pin_rooms = tuple(pinned[:3]), pinned[3], pinned[4]
+        self.free_cells = np.flatnonzero(~self.locked.ravel())
+
+        # (batch, day) rows with pins choose their break among the periods left open
+        self.break_options = {}
+        for b, d in {(b, d) for b, d, *_ in pins}:
+            open_periods = [p for p in range(self.periods_per_day) if not self.locked[b, d, p]]
+            self.break_options[b, d] = [p for p in BREAK_SLOTS if p in open_periods] or open_periods
+
+    @staticmethod
+    def _new_stats():
+        return {"generations": 0, "fitness_evaluations": 0, "full_evaluations": 0, "elapsed": 0.0,
+                "stopped_by": None}
+
+    def __getstate__(self):
+        """Picklable form for worker processes: entities are reduced to their ids."""
+        state = self.__dict__.copy()
+        for name in ("subjects", "faculties", "batches", "classrooms", "special_classes"):
+            state[name] = [entity.id for entity in state[name]]
+        state["population"] = []
+        return state
 
     # ---------- POPULATION SETUP ----------
     def initialize_population(self):
-        """Create initial random population."""
-        self.population = [self.generate_random_timetable() for _ in range(self.population_size)]
+        """Create the initial population: ``greedy_ratio`` of it greedy, the rest random."""
+        n_greedy = min(self.population_size, max(0, round(self.population_size * self.greedy_ratio)))
+        self.population = ([self.generate_greedy_timetable() for _ in range(n_greedy)] +
+                           [self.generate_random_timetable() for _ in range(self.population_size - n_greedy)])
 
     def generate_random_timetable(self):
-        """Generate a timetable PER BATCH."""
+        """Generate a random genome with one break per (batch, day)."""
+        subjects = self.rng.integers(len(self.subjects), size=self.shape, dtype=np.int16)
+        rooms = self.rng.integers(len(self.classrooms), size=self.shape, dtype=np.int16)
+
+        b, d = np.indices(self.shape[:2])
+        break_slot = self.rng.choice(BREAK_SLOTS, size=self.shape[:2])
+        for row, options in self.break_options.items():
+            break_slot[row] = self.rng.choice(options)
+        subjects[b, d, break_slot] = BREAK
+        rooms[b, d, break_slot] = BREAK
+        subjects[self.pin_cells], rooms[self.pin_cells] = self.pin_subjects, self.pin_rooms
+        return Genome(subjects, rooms).freeze()
+
+    def generate_greedy_timetable(self):
+        """
+        Constraint-aware construction, one batch at a time in random order.
+        Every free cell gets the subject with the most weekly classes still owed
+        (Subject.classes_per_week) that is not yet on that day and whose faculty
+        is free at that slot in every batch placed so far and under
+        Faculty.max_classes_per_day; the room is a free one, big enough if possible.
+        Constraints are relaxed one by one only when nothing fits.
+        """
+        n_batches, n_days, n_periods = self.shape
+        n_subjects, n_rooms = len(self.subjects), len(self.classrooms)
+        subject_faculty = self.subject_faculty.tolist()
+        subjects = np.empty(self.shape, dtype=np.int16)
+        rooms = np.empty(self.shape, dtype=np.int16)
+
+        # Occupancy shared by all batches (the graph-colouring "used colours"), reserved slots taken
+        occupancy = OccupancyIndex(self.reserved_faculty.reshape(-1, n_days, n_periods).copy(),
+                                   self.reserved_room.reshape(-1, n_days, n_periods).copy())
+        faculty_load = occupancy.faculty_load
+        faculty_load[:] = 0   # a reserved slot is not teaching load in this timetable
+        rnd = self.random
+
+        # special classes are booked before any batch is filled
+        owed = [list(self.weekly_demand) for _ in range(n_batches)]
+        on_day = [[set() for _ in range(n_days)] for _ in range(n_batches)]
+        for b, d, p, s, room in self.pins:
+            subjects[b, d, p], rooms[b, d, p] = s, room
+            owed[b][s] -= 1
+            on_day[b][d].add(s)
+            occupancy.book(d, p, subject_faculty[s], room)
+
+        for b in rnd.sample(range(n_batches), n_batches):
+            owed_b, on_day_b = owed[b], on_day[b]
+            cells = []
+            for d in range(n_days):
+                break_slot = rnd.choice(self.break_options.get((b, d), BREAK_SLOTS))
+                subjects[b, d, break_slot] = rooms[b, d, break_slot] = BREAK
+                cells.extend((d, p) for p in range(n_periods) if p != break_slot and not self.locked[b, d, p])
+            rnd.shuffle(cells)
+
+            room_order = sorted(range(n_rooms), key=lambda r: (self.room_capacities[r] < self.batch_sizes[b],
+                                                                 rnd.random()))
+            for d, p in cells:
+                fresh = [s for s in range(n_subjects) if s not in on_day_b[d]] or range(n_subjects)
+                busy = occupancy.faculty_bits[d][p]
+                free = [s for s in fresh if not busy >> subject_faculty[s] & 1]
+                fits = [s for s in free
+                        if faculty_load[subject_faculty[s], d] < self.faculty_daily_limit[subject_faculty[s]]]
+                s = max(fits or free or fresh, key=lambda s: owed_b[s] + rnd.random())   # most owed first
+                room = next((r for r in room_order if occupancy.room_free(r, d, p)), room_order[0])
+
+                subjects[b, d, p], rooms[b, d, p] = s, room
+                owed_b[s] -= 1
+                on_day_b[d].add(s)
+                occupancy.book(d, p, subject_faculty[s], room)
+
+        return Genome(subjects, rooms).freeze()
+
+    def decode(self, genome):
+        """Expand a genome into the ``{batch: {day: [slot, ...]}}`` form used for rendering."""
         timetable = {}
+        subjects, rooms = genome.subjects.tolist(), genome.rooms.tolist()
 
-        for batch in self.batches:
+        for b, batch in enumerate(self.batches):
             timetable[batch] = {}
-            for day in self.days:
+            for d, day in enumerate(self.days):
                 slots = []
-                break_slot = random.choice([2, 3])
-                for p in range(self.periods_per_day):
-                    if p == break_slot:
+                for s, r in zip(subjects[b][d], rooms[b][d]):
+                    if s == BREAK:
                         slots.append({"subject": "BREAK", "faculty": None, "batch": batch, "classroom": None})
                     else:
-                        subj = random.choice(self.subjects)
+                        subj = self.subjects[s]
                         slots.append({
                             "subject": subj,
-                            "faculty": subj.faculty,
-                            "batch": batch,   # ✅ fixed: timetable belongs to this batch only
-                            "classroom": random.choice(self.classrooms)
+                            "faculty": self.faculties[self.subject_faculty[s]],
+                            "batch": batch,
+                            "classroom": self.classrooms[r]
                         })
                 timetable[batch][day] = slots
         return timetable
 
+    def assignments(self, genome):
+        """One dict of ids per taught slot (breaks left out), in (batch, day, period) order."""
+        b, d, p = np.nonzero(genome.subjects != BREAK)
+        cells = zip(b.tolist(), d.tolist(), p.tolist(),
+                    genome.subjects[b, d, p].tolist(), genome.rooms[b, d, p].tolist())
+        return [
+            {"batch_id": self.batches[b].id, "day": self.days[d], "period": p + 1,
+             "subject_id": self.subjects[s].id, "faculty_id": self.faculties[self.subject_faculty[s]].id,
+             "classroom_id": self.classrooms[r].id}
+            for b, d, p, s, r in cells
+        ]
+
 
     # ---------- FITNESS FUNCTION ----------
-    def fitness(self, timetable, debug=False):
-        score = 100
-        issues = []
-        hard_violation = False
+    def _keys(self, b, d, p, subjects, rooms):
+        """Counter keys (faculty, room, subject-per-day) of the taught slots among the given cells."""
+        taught = subjects != BREAK
+        b, d, p = b[taught], d[taught], p[taught]
+        subjects, rooms = subjects[taught].astype(np.intp), rooms[taught].astype(np.intp)
+        n_days, n_periods = len(self.days), self.periods_per_day
 
-        for batch, days in timetable.items():
-            for day, slots in days.items():
-                subjects_seen = set()
-                break_count = 0
+        slot = d * n_periods + p
+        return (
+            self.subject_faculty[subjects].astype(np.intp) * (n_days * n_periods) + slot,
+            rooms * (n_days * n_periods) + slot,
+            (b * n_days + d) * len(self.subjects) + subjects
+        )
 
-                for i, slot in enumerate(slots):
-                    if slot["subject"] == "BREAK":
-                        break_count += 1
-                        if i not in [2, 3]:
-                            issues.append(f"Break in wrong slot for {batch.name} on {day}")
-                            score -= 5
-                        continue
-
-                    subj, fac, bat, room = slot["subject"], slot["faculty"], slot["batch"], slot["classroom"]
-
-                    # ❌ Hard constraint: No same subject twice in a day
-                    if subj in subjects_seen:
-                        issues.append(f"{batch.name}: Subject {subj.name} repeats on {day}")
-                        hard_violation = True
-                    subjects_seen.add(subj)
-
-                    # ❌ Hard constraint: No faculty/room clash
-                    for j, other_slot in enumerate(slots):
-                        if j == i or other_slot["subject"] == "BREAK":
-                            continue
-                        if fac == other_slot["faculty"] or room == other_slot["classroom"]:
-                            issues.append(f"{batch.name}: Clash at {day} slot {i+1}")
-                            hard_violation = True
-
-                # ❌ Hard constraint: exactly 1 break
-                if break_count != 1:
-                    issues.append(f"{batch.name}: {day} has {break_count} breaks instead of 1")
-                    hard_violation = True
-
-        if hard_violation:
-            return 0, issues   # 🚨 reject this timetable completely
-        return score, issues
+    def _break_counts(self, subjects):
+        """(rows without exactly one break, misplaced breaks) for a (..., periods) array."""
+        breaks = subjects == BREAK
+        return (
+            int((np.count_nonzero(breaks, axis=-1) != 1).sum()),
+            int(np.count_nonzero(breaks[..., self.bad_break_periods]))
+        )
+
+    def evaluate(self, genome):
+        """Build the FitnessState of a genome from scratch (one pass over all slots)."""
+        n_slots = len(self.days) * self.periods_per_day
+        fac_keys, room_keys, subj_keys = self._keys(*self.cells, genome.subjects.ravel(), genome.rooms.ravel())
+
+        state = FitnessState(
+            np.bincount(fac_keys, minlength=len(self.faculties) * n_slots).astype(np.int16) + self.reserved_faculty,
+            np.bincount(room_keys, minlength=len(self.classrooms) * n_slots).astype(np.int16) + self.reserved_room,
+            np.bincount(subj_keys, minlength=len(self.batches) * len(self.days) * len(self.subjects)).astype(np.int16)
+        )
+        state.break_errors, state.misplaced_breaks = self._break_counts(genome.subjects)
+        return state
+
+    def occupancy(self, genome):
+        """Global OccupancyIndex of a genome, built from its (cached) counters."""
+        state = self._state(genome)
+        shape = (len(self.days), self.periods_per_day)
+        return OccupancyIndex(state.faculty_busy.reshape(-1, *shape).copy(),
+                              state.room_busy.reshape(-1, *shape).copy())
+
+    def _state(self, genome):
+        if genome.state is None:
+            genome.state = self.evaluate(genome)
+            self.stats["full_evaluations"] += 1
+        return genome.state
+
+    def _move(self, state, b, d, p, old, new):
+        """Re-book slot (b, d, p) from ``old`` to ``new`` (subject, room): O(1) counter updates."""
+        n_days, n_periods = len(self.days), self.periods_per_day
+        slot = d * n_periods + p
+        for step, (subj, room) in ((-1, old), (1, new)):
+            if subj == BREAK:
+                continue
+            state.faculty_clashes += _book(state.faculty_busy, int(self.subject_faculty[subj]) * n_days * n_periods + slot, step)
+            state.room_clashes += _book(state.room_busy, room * n_days * n_periods + slot, step)
+            state.repeats += _book(state.subject_day, (b * n_days + d) * len(self.subjects) + subj, step)
+
+    def score(self, genome):
+        """Numeric fitness used for ranking: ``penalties.base`` minus the weighted violations.
+
+        Only counters are read (no violation records are built); memoized on the genome,
+        so survivors are not re-scored every generation.
+        """
+        if genome.fitness is None:
+            genome.fitness = self.penalties.score(*self._state(genome).counts)
+            self.stats["fitness_evaluations"] += 1
+        return genome.fitness
+
+    def evaluate_population(self, genomes):
+        """Score many genomes at once from a stacked (population, batch, day, period) tensor.
+
+        Same rules as ``score``: faculty/room double bookings are bincounts over keys
+        offset per individual and repeats come from sorted day rows, so the whole
+        population costs a handful of NumPy reductions.
+        """
+        subjects = np.stack([g.subjects for g in genomes])
+        rooms = np.stack([g.rooms for g in genomes])
+        n_genomes = len(genomes)
+        n_days, n_periods = len(self.days), self.periods_per_day
+
+        taught = subjects != BREAK
+        owner, _, d, p = np.nonzero(taught)
+        subj, room = subjects[taught].astype(np.intp), rooms[taught].astype(np.intp)
+        slot = d * n_periods + p
+
+        def excess(keys, reserved):
+            per_genome = len(reserved)
+            counts = np.bincount(keys, minlength=n_genomes * per_genome).reshape(n_genomes, per_genome)
+            return np.maximum(counts + reserved - 1, 0).sum(axis=1)
+
+        faculty_clashes = excess((owner * len(self.faculties) + self.subject_faculty[subj]) * (n_days * n_periods)
+                                 + slot, self.reserved_faculty)
+        room_clashes = excess((owner * len(self.classrooms) + room) * (n_days * n_periods) + slot, self.reserved_room)
+        # same-subject repeats: equal neighbours once each (batch, day) row is sorted
+        ordered = np.sort(subjects, axis=3)
+        repeats = np.count_nonzero((ordered[..., 1:] == ordered[..., :-1]) & (ordered[..., 1:] != BREAK),
+                                   axis=(1, 2, 3))
+        breaks = subjects == BREAK
+        break_errors = (np.count_nonzero(breaks, axis=3) != 1).sum(axis=(1, 2))
+        misplaced = np.count_nonzero(breaks[..., self.bad_break_periods], axis=(1, 2, 3))
+
+        self.stats["fitness_evaluations"] += n_genomes
+        self.stats["full_evaluations"] += n_genomes
+        return self.penalties.score(faculty_clashes, room_clashes, repeats, break_errors, misplaced)
+
+    def score_population(self, genomes):
+        """Scores of ``genomes``; with ``vectorized`` on, the ones lacking counters are batched."""
+        if self.vectorized:
+            pending = [g for g in genomes if g.fitness is None and g.state is None]
+            if pending:
+                for genome, score in zip(pending, self.evaluate_population(pending).tolist()):
+                    genome.fitness = score
+        return [self.score(g) for g in genomes]
+
+    # ---------- DIAGNOSTICS ----------
+    def violations(self, genome):
+        """Structured ``Violation`` records for the UI and the repair tools.
+
+        One record per class involved in a faculty/room clash or a same-day repeat, per
+        (batch, day) row without exactly one break and per misplaced break. This pass
+        is never run while evolving; ranking only reads the counters (see ``score``).
+        """
+        state = self._state(genome)
+        n_days, n_periods = len(self.days), self.periods_per_day
+        subjects, rooms = genome.subjects, genome.rooms
+        taught = subjects != BREAK
+        faculty = np.where(taught, self.subject_faculty[np.where(taught, subjects, 0)], -1)
+        records = []
+
+        def record(kind, b, d, p=None, count=1):
+            s = int(subjects[b, d, p]) if p is not None else BREAK
+            ids = (None, None, None) if s == BREAK else (
+                self.faculties[self.subject_faculty[s]].id, self.subjects[s].id, self.classrooms[int(rooms[b, d, p])].id)
+            records.append(Violation(kind, kind in HARD_CONSTRAINTS, self.batches[b].id, self.days[d],
+                                     None if p is None else p + 1, *ids, count))
+
+        for kind, counts, owner in (("faculty_clash", state.faculty_busy, faculty), ("room_clash", state.room_busy, rooms)):
+            for key in np.flatnonzero(counts > 1).tolist():
+                i, slot = divmod(key, n_days * n_periods)
+                d, p = divmod(slot, n_periods)
+                for b in np.flatnonzero(owner[:, d, p] == i).tolist():
+                    record(kind, b, d, p, int(counts[key]))
+
+        for key in np.flatnonzero(state.subject_day > 1).tolist():
+            row, s = divmod(key, len(self.subjects))
+            b, d = divmod(row, n_days)
+            for p in np.flatnonzero(subjects[b, d] == s).tolist():
+                record("repeat", b, d, p, int(state.subject_day[key]))
+
+        break_count = np.count_nonzero(~taught, axis=2)
+        for b, d in zip(*(axis.tolist() for axis in np.nonzero(break_count != 1))):
+            record("break_count", b, d, count=int(break_count[b, d]))
+        for b, d, i in zip(*(axis.tolist() for axis in np.nonzero(~taught[:, :, self.bad_break_periods]))):
+            record("misplaced_break", b, d, self.bad_break_periods[i])
+        return records
+
+    def fitness(self, genome):
+        """Return ``(score, issues)`` with a readable line per violation (for reports, not the GA loop)."""
+        names = {kind: {item.id: item.name for item in items} for kind, items in (
+            ("batch", self.batches), ("faculty", self.faculties), ("subject", self.subjects), ("room", self.classrooms))}
+        issues, seen = [], set()
+        for v in self.violations(genome):
+            if v.kind in ("faculty_clash", "room_clash"):
+                label, kind, owner = ("Faculty", "faculty", v.faculty_id) if v.kind == "faculty_clash" else \
+                    ("Room", "room", v.classroom_id)
+                key, line = (v.kind, owner, v.day, v.period), (f"Clash: {label} {names[kind][owner]} booked "
+                                                               f"{v.count}x on {v.day} slot {v.period}")
+            elif v.kind == "repeat":
+                key, line = (v.kind, v.batch_id, v.day, v.subject_id), (
+                    f"{names['batch'][v.batch_id]}: Subject {names['subject'][v.subject_id]} repeats on {v.day}")
+            elif v.kind == "break_count":
+                key, line = None, f"{names['batch'][v.batch_id]}: {v.day} has {v.count} breaks instead of 1"
+            else:
+                key, line = (v.kind, v.batch_id, v.day), f"Break in wrong slot for {names['batch'][v.batch_id]} on {v.day}"
+            if key is None or key not in seen:
+                seen.add(key)
+                issues.append(line)
+        return self.score(genome), issues
 
 
     # ---------- GENETIC OPERATORS ----------
     def crossover(self, parent1, parent2):
-        """Batch + day-wise crossover between two parents (safe across batches)."""
-        child = {}
-
-        # union of all batches across both parents
-        all_batches = set(parent1.keys()) | set(parent2.keys())
-
-        for batch in all_batches:
-            child[batch] = {}
-            for day in self.days:
-                if batch in parent1 and batch in parent2:
-                    # pick randomly from either parent
-                    if random.random() < 0.5:
-                        child[batch][day] = copy.deepcopy(parent1[batch][day])
-                    else:
-                        child[batch][day] = copy.deepcopy(parent2[batch][day])
-                elif batch in parent1:
-                    child[batch][day] = copy.deepcopy(parent1[batch][day])
-                else:
-                    child[batch][day] = copy.deepcopy(parent2[batch][day])
+        """Batch + day-wise crossover: each (batch, day) row comes from either parent.
 
-        return child
+        The child is built with one vectorized select; if every row comes from the
+        same parent that (frozen) parent is returned as-is instead of a copy. With
+        ``incremental`` on, the child's counters start from the parent that gave the
+        most rows and only the slots of the swapped-in rows are updated.
+        """
+        take_first = self.rng.random(self.shape[:2]) < 0.5
+        if take_first.all():
+            return parent1
+        if not take_first.any():
+            return parent2
 
-    def mutate(self, timetable):
-        """Randomly change one slot in one batch (preserving break rules)."""
-        mutated = copy.deepcopy(timetable)
+        rows = take_first[:, :, None]
+        child = Genome(
+            np.where(rows, parent1.subjects, parent2.subjects),
+            np.where(rows, parent1.rooms, parent2.rooms)
+        )
 
-        # pick a random batch first
-        batch = random.choice(list(mutated.keys()))
-        day = random.choice(self.days)
+        if self.incremental:
+            base, other, swapped = parent1, parent2, ~take_first
+            if 2 * np.count_nonzero(take_first) < take_first.size:
+                base, other, swapped = parent2, parent1, take_first
+            if base.state is not None:
+                child.state = self._derive(base, other, *np.nonzero(swapped))
+        return child
 
-        period_index = random.randint(0, self.periods_per_day - 1)
-        slot = mutated[batch][day][period_index]
+    def _derive(self, base, other, rb, rd):
+        """Counters of ``base`` with its rows (rb, rd) replaced by those of ``other``.
 
-        if slot["subject"] == "BREAK":
-            return mutated  # don’t mutate breaks
+        Only the slots that differ are re-booked: one by one when there are few of them,
+        else with one scatter-add per counter array. Returns None when so many slots differ that a full evaluation is cheaper.
+        """
+        old_subjects, old_rooms = base.subjects[rb, rd], base.rooms[rb, rd]
+        new_subjects, new_rooms = other.subjects[rb, rd], other.rooms[rb, rd]
+        changed = (old_subjects != new_subjects) | (old_rooms != new_rooms)
+        rows, periods = np.nonzero(changed)
+        if len(rows) > DELTA_MAX_FRACTION * self.cells.shape[1]:
+            return None
 
-        subj = random.choice(self.subjects)
-        mutated[batch][day][period_index] = {
-            "subject": subj,
-            "faculty": subj.faculty,
-            "batch": batch,  # ✅ keep consistent
-            "classroom": random.choice(self.classrooms)
-        }
-        return mutated
+        state = base.state.copy()
+        if len(rows) <= DELTA_LOOP_MAX:
+            old = zip(old_subjects[changed].tolist(), old_rooms[changed].tolist())
+            new = zip(new_subjects[changed].tolist(), new_rooms[changed].tolist())
+            for b, d, p, before, after in zip(rb[rows].tolist(), rd[rows].tolist(), periods.tolist(), old, new):
+                self._move(state, b, d, p, before, after)
+        else:
+            b, d = rb[rows], rd[rows]
+            removed = self._keys(b, d, periods, old_subjects[changed], old_rooms[changed])
+            added = self._keys(b, d, periods, new_subjects[changed], new_rooms[changed])
+            state.faculty_clashes += _rebook(state.faculty_busy, removed[0], added[0])
+            state.room_clashes += _rebook(state.room_busy, removed[1], added[1])
+            state.repeats += _rebook(state.subject_day, removed[2], added[2])
 
+        old_errors, old_misplaced = self._break_counts(old_subjects)
+        new_errors, new_misplaced = self._break_counts(new_subjects)
+        state.break_errors += new_errors - old_errors
+        state.misplaced_breaks += new_misplaced - old_misplaced
+        return state
 
-    def mutate(self, timetable):
-        """Randomly change one slot in one batch (preserving break rules)."""
-        mutated = copy.deepcopy(timetable)
+    def mutate(self, genome):
+        """Randomly change one slot in one batch (preserving break rules and special classes).
 
-        # pick a random batch first
-        batch = random.choice(list(mutated.keys()))
-        day = random.choice(self.days)
+        Copy-on-write: a frozen genome is copied before the change, while a fresh
+        child straight out of ``crossover`` is changed in place. Known counters are
+        always carried over and updated for the one slot rather than re-evaluated
+        (``incremental`` only concerns crossover).
+        """
+        # pick a random slot that is not a special class
+        cell = int(self.free_cells[self.random.randrange(len(self.free_cells))])
+        b, d, p = (int(i) for i in np.unravel_index(cell, self.shape))
 
-        period_index = random.randint(0, self.periods_per_day - 1)
-        slot = mutated[batch][day][period_index]
+        if genome.subjects[b, d, p] == BREAK:
+            return genome  # don’t mutate breaks
 
-        if slot["subject"] == "BREAK":
-            return mutated  # don’t mutate breaks
+        state = genome.state
+        if genome.frozen:
+            genome = Genome(genome.subjects.copy(), genome.rooms.copy())
+            state = state.copy() if state is not None else None
+        old = int(genome.subjects[b, d, p]), int(genome.rooms[b, d, p])
+        new = self.random.randrange(len(self.subjects)), self.random.randrange(len(self.classrooms))
+        genome.subjects[b, d, p], genome.rooms[b, d, p] = new
 
-        subj = random.choice(self.subjects)
-        mutated[batch][day][period_index] = {
-            "subject": subj,
-            "faculty": subj.faculty,
-            "batch": batch,  # ✅ keep the same batch, don’t randomize
-            "classroom": random.choice(self.classrooms)
-        }
-        return mutated
+        if state is not None:
+            self._move(state, b, d, p, old, new)
+        genome.state = state
+        genome.fitness = None
+        return genome
 
 
     # ---------- EVOLUTION LOOP ----------
-    def evolve(self, generations=50):
-        """Run the genetic algorithm for given generations."""
+    def iter_evolve(self, generations=50):
+        """Run the genetic algorithm, yielding progress stats after every generation.
+
+        Stop iterating (e.g. ``break``) to end the run early; ``self.population`` always
+        holds the latest generation.
+        """
+        start = time.perf_counter()
         for _ in range(generations):
-            ranked = sorted(self.population, key=lambda t: self.fitness(t)[0], reverse=True)
+            self.score_population(self.population)
+            ranked = sorted(self.population, key=self.score, reverse=True)
+            if self.local_search:
+                ranked = self.local_search.apply(self, ranked)
+            if self.niche_radius is not None:
+                kept, cleared = self._clear(ranked, self.niche_radius)
+                ranked = kept + cleared
 
             # Survivors: top 25% + random 25%
             survivors = ranked[:len(ranked)//4]
-            survivors += random.sample(ranked[len(ranked)//4:], len(ranked)//4)
+            survivors += self.random.sample(ranked[len(ranked)//4:], len(ranked)//4)
 
             # Generate children
             children = []
             while len(children) + len(survivors) < self.population_size:
-                p1, p2 = random.sample(survivors, 2)
+                p1, p2 = self.random.sample(survivors, 2)
                 child = self.crossover(p1, p2)
-                if random.random() < 0.2:
+                if self.random.random() < 0.2:
                     child = self.mutate(child)
-                children.append(child)
+                children.append(child.freeze())
 
             self.population = survivors + children
+            self.stats["generations"] += 1
+            yield self._progress(ranked, start)
+
+    def evolve(self, generations=50, on_generation=None, stop=None):
+        """Run the genetic algorithm for at most ``generations`` generations.
 
-    def run(self, generations=50):
-        """Initialize + evolve, return best timetable."""
+        ``on_generation(stats)`` gets the ``iter_evolve`` stats after each generation;
+        returning True from it stops the run early. ``stop`` is an optional StopPolicy.
+        The reason the run ended is recorded in ``self.stats["stopped_by"]``.
+        """
+        self.stats["stopped_by"] = "generations"
+        if stop:
+            stop.reset()
+        for stats in self.iter_evolve(generations):
+            if on_generation and on_generation(stats):
+                self.stats["stopped_by"] = "callback"
+                break
+            reason = stop.check(stats, self.stats["fitness_evaluations"]) if stop else None
+            if reason:
+                self.stats["stopped_by"] = reason
+                break
+
+    def _progress(self, ranked, start):
+        """Per-generation stats: best/mean fitness, hard violations of the best, elapsed seconds."""
+        scores = [self.score(g) for g in ranked]
+        return {
+            "generation": self.stats["generations"],
+            "best_fitness": scores[0],
+            "mean_fitness": round(sum(scores) / len(scores), 2),
+            "hard_violations": self._state(ranked[0]).hard_violations,
+            "elapsed": round(time.perf_counter() - start, 3)
+        }
+
+    def run(self, generations=50, on_generation=None, stop=None, top_k=None):
+        """Initialize + evolve, return best timetable (run counters end up in ``self.stats``).
+
+        With ``top_k`` set, return the ``top_k`` best distinct timetables instead (see ``top``).
+        """
+        self.stats = self._new_stats()
+        start = time.perf_counter()
         self.initialize_population()
-        self.evolve(generations)
-        return max(self.population, key=lambda t: self.fitness(t)[0])
+        self.evolve(generations, on_generation, stop)
+        self.score_population(self.population)
+        best = max(self.population, key=self.score)
+        self.stats["elapsed"] = round(time.perf_counter() - start, 3)
+        return best if top_k is None else self.top(top_k)
+
+    # ---------- PARALLEL ISLAND MODEL ----------
+    def run_islands(self, generations=50, islands=4, workers=None, migration_interval=10, migrants=2,
+                    on_generation=None, stop=None, top_k=None):
+        """Evolve ``islands`` independent populations in worker processes.
+
+        Every ``migration_interval`` generations the best ``migrants`` of each island
+        replace the worst of the next one (ring topology). Each island has its own
+        generators spawned from ``seed`` and migration happens in island order, so
+        the result and the run stats depend only on the seed and island count, not on
+        ``workers``.
+        ``on_generation(stats)`` is called and the ``stop`` policy checked after every
+        migration epoch, so stopping rules act at epoch granularity here. ``top_k`` works
+        as in ``run``, over all islands.
+        """
+        self.stats = self._new_stats()
+        self.stats["stopped_by"] = "generations"
+        if stop:
+            stop.reset()
+        start = time.perf_counter()
+
+        island_seeds = np.random.SeedSequence(self.seed).spawn(islands)
+        populations, generators = [], []
+        own_generators = self.random, self.rng
+        for seq in island_seeds:
+            self.random = random.Random(int(seq.generate_state(1)[0]))
+            self.rng = np.random.default_rng(seq)
+            self.initialize_population()
+            populations.append(self.population)
+            generators.append((self.random, self.rng))
+        self.random, self.rng = own_generators
+
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_CONTEXT) if workers != 1 else None
+        try:
+            done = 0
+            while done < generations:
+                step = min(migration_interval, generations - done)
+                jobs = [(self, population, rngs, step) for population, rngs in zip(populations, generators)]
+                results = pool.map(_evolve_island, *zip(*jobs)) if pool else map(_evolve_island, *zip(*jobs))
+
+                populations, generators = [], []
+                for population, rngs, stats in results:
+                    populations.append(population)
+                    generators.append(rngs)
+                    self.stats["fitness_evaluations"] += stats["fitness_evaluations"]
+                    self.stats["full_evaluations"] += stats["full_evaluations"]
+                done += step
+                self.stats["generations"] = done
+                ranked = sorted((g for population in populations for g in population), key=self.score, reverse=True)
+                progress = self._progress(ranked, start)
+                if on_generation and on_generation(progress):
+                    self.stats["stopped_by"] = "callback"
+                    break
+                reason = stop.check(progress, self.stats["fitness_evaluations"]) if stop else None
+                if reason:
+                    self.stats["stopped_by"] = reason
+                    break
+
+                if done < generations and islands > 1:
+                    self._migrate(populations, migrants)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.population = [genome for population in populations for genome in population]
+        best = max(self.population, key=self.score)
+        self.stats["elapsed"] = round(time.perf_counter() - start, 3)
+        return best if top_k is None else self.top(top_k)
+
+    def _migrate(self, populations, migrants):
+        """Ring migration: island i's best replace island i+1's worst (populations come back sorted)."""
+        emigrants = [population[:migrants] for population in populations]
+        for i, population in enumerate(populations):
+            population[-migrants:] = emigrants[i - 1]
+
+
+    # ---------- DIVERSITY ----------
+    def distance(self, a, b):
+        """Share of slots where two genomes differ in subject or room (0 = clones)."""
+        return np.count_nonzero((a.subjects != b.subjects) | (a.rooms != b.rooms)) / a.subjects.size
+
+    def differences(self, a, b):
+        """``{batch name: changed slots}`` of ``b`` compared with ``a``, for batches that differ."""
+        changed = np.count_nonzero((a.subjects != b.subjects) | (a.rooms != b.rooms), axis=(1, 2))
+        return {self.batches[i].name: int(changed[i]) for i in np.flatnonzero(changed).tolist()}
+
+    def _clear(self, ranked, radius):
+        """Clearing (a form of fitness sharing): walking best-first, a genome within ``radius``
+        of an already kept one is cleared. Returns ``(kept, cleared)``, both best-first;
+        ranking cleared genomes last keeps clones from taking over the survivors.
+        """
+        size = self.cells.shape[1]
+        kept_subjects = np.empty((len(ranked), size), dtype=np.int16)
+        kept_rooms = np.empty((len(ranked), size), dtype=np.int16)
+        kept, cleared = [], []
+        limit = radius * size
+        for genome in ranked:
+            subjects, rooms = genome.subjects.ravel(), genome.rooms.ravel()
+            n = len(kept)
+            if n and np.count_nonzero((kept_subjects[:n] != subjects) | (kept_rooms[:n] != rooms), axis=1).min() <= limit:
+                cleared.append(genome)
+                continue
+            kept_subjects[n], kept_rooms[n] = subjects, rooms
+            kept.append(genome)
+        return kept, cleared
+
+    def top(self, k, min_distance=None):
+        """Up to ``k`` best genomes of the population that differ pairwise in more than
+        ``min_distance`` of their slots (default: the niche radius, else any one slot).
+
+        Genomes with more hard violations than the best are left out, so the
+        alternatives are never less feasible than the first option.
+        """
+        self.score_population(self.population)
+        ranked = sorted(self.population, key=self.score, reverse=True)
+        radius = min_distance if min_distance is not None else (self.niche_radius or 0)
+        distinct = self._clear(ranked, radius)[0]
+        most = self._state(distinct[0]).hard_violations
+        return [genome for genome in distinct if self._state(genome).hard_violations <= most][:k]
+
 
     # Print population report in terminal
     from prettytable import PrettyTable
@@ -221,18 +997,19 @@ class GeneticScheduler:
         :param best_only: if True, prints only the best timetable
         """
         timetables = (
-            [max(self.population, key=lambda t: self.fitness(t)[0])]
+            [max(self.population, key=self.score)]
             if best_only else self.population
         )
+        print(f"Run stats: {self.stats}")
 
-        for idx, timetable in enumerate(timetables, 1):
-            score, issues = self.fitness(timetable)
+        for idx, genome in enumerate(timetables, 1):
+            score, issues = self.fitness(genome)
             print(f"\n{'='*60}")
             print(f"Timetable #{idx} | Fitness Score: {score}")
             print(f"{'='*60}")
 
             # Pretty print per batch
-            for batch, days in timetable.items():
+            for batch, days in self.decode(genome).items():
                 print(f"\nBatch: {batch.name}")
                 table = PrettyTable()
                 table.field_names = ["Day"] + [f"Period {i+1}" for i in range(self.periods_per_day)]
@@ -262,59 +1039,71 @@ class GeneticScheduler:
 
 
     # ---------- PRETTY PRINT (HTML + Save to Project Folder) ----------
-    def pretty_table(self, timetable):
-        """Format multiple batch timetables as HTML tables (styled)."""
-        full_html = """
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                h1 { color: #2c3e50; }
-                h2 { margin-top: 30px; color: #8e44ad; }
-                table { border-collapse: collapse; width: 100%; margin-bottom: 40px; }
-                th, td { border: 1px solid #ddd; padding: 10px; text-align: center; }
-                th { background-color: #27ae60; color: white; }
-                td.break { background-color: #f9e79f; font-weight: bold; }
-                td.off { background-color: #d5d8dc; font-style: italic; }
-            </style>
-        </head>
-        <body>
-        <h1>Timetables</h1>
-        """
+    def pretty_table(self, genome, download_url=None):
+        """Format multiple batch timetables as HTML tables (styled), rendered in memory."""
+        return render_timetable_html(self.decode(genome), self.periods_per_day, download_url)
+
+
+def render_timetable_html(timetable, periods_per_day, download_url=None):
+    """Format ``{batch: {day: [slot, ...]}}`` timetables (see ``GeneticScheduler.decode``) as one styled HTML page."""
+    full_html = f"""
+    <html>
+    <head>
+        <style>{TIMETABLE_CSS}</style>
+    </head>
+    <body>
+    <h1>Timetables</h1>
+    """
+
+    for batch, days in timetable.items():
+        full_html += f"<h2> Batch: {batch.name}</h2>"
+        full_html += "<table><tr><th>Day</th>"
+
+        # Period headers
+        for i in range(periods_per_day):
+            full_html += f"<th>Period {i+1}<br>{PERIOD_TIMES[i+1]}</th>"
+        full_html += "</tr>"
+
+        # Day rows
+        for day in ALL_DAYS:   # include off-days
+            if day in OFF_DAYS:
+                full_html += f"<tr><td>{day}</td>" + "".join("<td class='off'>OFF</td>" for _ in range(periods_per_day)) + "</tr>"
+            else:
+                full_html += f"<tr><td>{day}</td>"
+                for slot in days[day]:
+                    if slot["subject"] == "BREAK":
+                        full_html += "<td class='break'> BREAK</td>"
+                    else:
+                        subj, fac, room = slot["subject"], slot["faculty"], slot["classroom"]
+                        full_html += f"<td><b>{subj.course_code} {subj.name}</b><br> {fac.name}<br>{room.name}</td>"
+                full_html += "</tr>"
+
+        full_html += "</table>"
+
+    if download_url:
+        full_html += f"<br><a href='{download_url}'>Download Timetable as HTML</a>"
+    full_html += """
+    </body></html>
+    """
+    return full_html
+
+
+def _evolve_island(scheduler, population, generators, generations):
+    """Worker entry point: evolve one island and return it ranked best-first."""
+    island = GeneticScheduler.__new__(GeneticScheduler)   # own copy, also when run in-process
+    island.__dict__.update(vars(scheduler))
+    island.population = _detached(population)
+    island.random, island.rng = generators
+    island.stats = island._new_stats()
+    island.evolve(generations)
+    island.score_population(island.population)
+    ranked = sorted(island.population, key=island.score, reverse=True)
+    return _detached(ranked), (island.random, island.rng), island.stats
 
-        for batch, days in timetable.items():
-            full_html += f"<h2> Batch: {batch.name}</h2>"
-            full_html += "<table><tr><th>Day</th>"
-
-            # Period headers
-            for i in range(self.periods_per_day):
-                full_html += f"<th>Period {i+1}<br>{PERIOD_TIMES[i+1]}</th>"
-            full_html += "</tr>"
-
-            # Day rows
-            for day in ALL_DAYS:   # include off-days
-                if day in OFF_DAYS:
-                    full_html += f"<tr><td>{day}</td>" + "".join("<td class='off'>OFF</td>" for _ in range(self.periods_per_day)) + "</tr>"
-                else:
-                    full_html += f"<tr><td>{day}</td>"
-                    for slot in days[day]:
-                        if slot["subject"] == "BREAK":
-                            full_html += "<td class='break'> BREAK</td>"
-                        else:
-                            subj, fac, room = slot["subject"], slot["faculty"], slot["classroom"]
-                            full_html += f"<td><b>{subj.course_code} {subj.name}</b><br> {fac.name}<br>{room.name}</td>"
-                    full_html += "</tr>"
-
-            full_html += "</table>"
-
-        full_html += """
-        <br><a href='/download_timetable'>Download Timetable as HTML</a>
-        </body></html>
-        """
 
-        # Save once to timetable.html
-        file_path = os.path.join(os.path.dirname(__file__), "timetable.html")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(full_html)
+def _detached(genomes):
+    """The genomes as a worker process exchanges them (pickled: score kept, counters dropped).
 
-        return full_html
+    Applied in-process too, so ``workers=1`` re-evaluates exactly what a pool would.
+    """
+    return [_restore_genome(genome.subjects, genome.rooms, genome.fitness) for genome in genomes]
@@ -0,0 +1,205 @@
+# importer.py
+# Bulk import of faculties, classrooms, batches, subjects and special classes from
+# CSV, JSON or JSON Lines. Records are validated one by one, references are resolved
+# by natural key (faculty by name, subject by course_code, ...) from lookups loaded
+# once per file, and rows are inserted with executemany in chunks. Everything runs
+# in the caller's transaction, so a failed file leaves the DB untouched.
+import csv
+import io
+import json
+
+from sqlalchemy import insert, select
+
+from db_extensions import db
+from models import Classroom, Faculty, Subject, Batch, SpecialClass
+from genetic_scheduler import DAYS, PERIODS_PER_DAY
+
+CHUNK_SIZE = 1000   # rows per executemany
+MAX_ERRORS = 50     # validation errors reported per file
+REQUIRED = object()
+
+
+class ImportFailed(ValueError):
+    """Validation failed; ``errors`` holds one message per bad field (row numbers are 1-based)."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid field(s): " + "; ".join(errors[:3]))
+        self.errors = errors
+
+
+# ---------- FIELD CHECKS ----------
+def _text(value):
+    value = str(value).strip()
+    if not value:
+        raise ValueError("must not be empty")
+    return value
+
+
+def _count(value):
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError("must be a whole number")
+    if number < 0:
+        raise ValueError("must not be negative")
+    return number
+
+
+def _positive(value):
+    number = _count(value)
+    if number == 0:
+        raise ValueError("must be positive")
+    return number
+
+
+def _day(value):
+    day = _text(value).capitalize()
+    if day not in DAYS:
+        raise ValueError(f"must be one of {', '.join(DAYS)}")
+    return day
+
+
+def _period(value):
+    period = _positive(value)
+    if period > PERIODS_PER_DAY:   # the week the scheduler fills, see GeneticScheduler._pin
+        raise ValueError(f"must be between 1 and {PERIODS_PER_DAY}")
+    return period
+
+
+# kind -> model, {column: (check, default or REQUIRED)}, {fk column: (natural key column, model, model attribute)}
+IMPORTS = {
+    "faculties": (Faculty, {"name": (_text, REQUIRED), "max_classes_per_day": (_positive, 6),
+                            "avg_leaves_per_month": (_count, 0)}, {}),
+    "classrooms": (Classroom, {"name": (_text, REQUIRED), "capacity": (_positive, REQUIRED)}, {}),
+    "batches": (Batch, {"name": (_text, REQUIRED), "num_students": (_positive, REQUIRED)}, {}),
+    "subjects": (Subject, {"name": (_text, REQUIRED), "course_code": (_text, REQUIRED),
+                          "classes_per_week": (_positive, 1)},
+                 {"faculty_id": ("faculty", Faculty, "name")}),
+    "special_classes": (SpecialClass, {"day": (_day, REQUIRED), "period": (_period, REQUIRED)},
+                        {"subject_id": ("course_code", Subject, "course_code"),
+                         "batch_id": ("batch", Batch, "name"),
+                         "room_id": ("room", Classroom, "name")}),
+}
+AMBIGUOUS = -1   # lookup value for a natural key shared by several rows
+
+
+# ---------- READING ----------
+def read_records(stream, fmt):
+    """Yield dict records from a text stream; CSV and JSON Lines are read line by line.
+
+    ``fmt`` is "csv" (header row), "json" (a list of objects) or "jsonl" (one object per line).
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "json":
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError("❌ A JSON import must be a list of objects")
+        yield from records
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"❌ Unknown import format {fmt!r} (use csv, json or jsonl)")
+
+
+def text_stream(binary):
+    """Text view of an uploaded (binary) file; a UTF-8 byte-order mark is skipped."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+# ---------- IMPORT ----------
+def _lookup(model, attribute):
+    """``{natural key: id}`` for a model, with AMBIGUOUS for keys several rows share."""
+    found = {}
+    for row_id, key in db.session.execute(select(model.id, getattr(model, attribute))):
+        found[key] = AMBIGUOUS if key in found else row_id
+    return found
+
+
+def import_records(kind, records):
+    """Validate ``records`` and insert them as ``kind`` rows (caller commits); returns the row count.
+
+    Raises ImportFailed listing the invalid fields; nothing is inserted for the file then
+    as long as the caller rolls back.
+    """
+    if kind not in IMPORTS:
+        raise ValueError(f"❌ Unknown import kind {kind!r}, expected one of {sorted(IMPORTS)}")
+    model, columns, references = IMPORTS[kind]
+    lookups = {fk: _lookup(ref_model, attribute) for fk, (_, ref_model, attribute) in references.items()}
+    ids = {fk: set(lookup.values()) for fk, lookup in lookups.items()}
+    course_codes = set(_lookup(Subject, "course_code")) if kind == "subjects" else None
+    slots = None   # (batch_id, day, period) cells a special class holds, in the DB or earlier in the file
+    if kind == "special_classes":
+        held = db.session.execute(select(SpecialClass.batch_id, SpecialClass.day, SpecialClass.period))
+        slots = {tuple(cell) for cell in held}
+
+    errors, chunk, count = [], [], 0
+    for n, record in enumerate(records, 1):
+        if not isinstance(record, dict):
+            errors.append(f"row {n}: not an object")
+            continue
+        row, row_errors = {}, []
+        for column, (check, default) in columns.items():
+            value = record.get(column)
+            if value is None or value == "":
+                if default is REQUIRED:
+                    row_errors.append(f"row {n}: {column} is required")
+                else:
+                    row[column] = default
+                continue
+            try:
+                row[column] = check(value)
+            except ValueError as e:
+                row_errors.append(f"row {n}: {column} {e}")
+
+        for fk, (key, _, attribute) in references.items():
+            if record.get(fk) not in (None, ""):
+                try:
+                    row[fk] = int(record[fk])
+                except (TypeError, ValueError):
+                    row_errors.append(f"row {n}: {fk} must be a whole number")
+                    continue
+                if row[fk] not in ids[fk]:
+                    row_errors.append(f"row {n}: no {key} #{row[fk]}")
+            elif record.get(key) not in (None, ""):
+                row[fk] = lookups[fk].get(str(record[key]).strip())
+                if row[fk] is None:
+                    row_errors.append(f"row {n}: no {key} with {attribute} {record[key]!r}")
+                elif row[fk] == AMBIGUOUS:
+                    row_errors.append(f"row {n}: several rows have {attribute} {record[key]!r}; give {fk} instead")
+            else:
+                row_errors.append(f"row {n}: {key} (or {fk}) is required")
+
+        if course_codes is not None and "course_code" in row:
+            if row["course_code"] in course_codes:
+                row_errors.append(f"row {n}: course_code {row['course_code']!r} already exists")
+            course_codes.add(row["course_code"])
+
+        if slots is not None and {"batch_id", "day", "period"} <= row.keys():
+            cell = (row["batch_id"], row["day"], row["period"])
+            if cell in slots:
+                row_errors.append(f"row {n}: batch #{cell[0]} already has a special class on {cell[1]} "
+                                  f"period {cell[2]}")
+            slots.add(cell)
+
+        if row_errors:
+            errors.extend(row_errors)
+            if len(errors) >= MAX_ERRORS:
+                break
+            continue
+        if errors:
+            continue   # keep validating, but the file will not be imported
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            db.session.execute(insert(model), chunk)
+            count += len(chunk)
+            chunk = []
+
+    if errors:
+        raise ImportFailed(errors[:MAX_ERRORS])
+    if chunk:
+        db.session.execute(insert(model), chunk)
+        count += len(chunk)
+    return count
@@ -1,8 +1,9 @@
 # init_db.py
 from app import app, db
+from db_extensions import create_schema
 from app import Classroom  # 👈 import the model explicitly
 
 # Create tables inside app context
 with app.app_context():
-    db.create_all()
+    create_schema()
     print("✅ Tables created successfully in timetable.db")
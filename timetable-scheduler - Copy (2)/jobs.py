@@ -0,0 +1,230 @@
+# jobs.py
+# Background timetable generation: a POST creates a GenerationJob row, a small
+# thread pool runs the chosen engine, and the row is updated with progress and the result.
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from db_extensions import db, create_schema
+from models import GenerationJob
+from snapshot import snapshot_cache
+from runs import save_run
+from genetic_scheduler import GeneticScheduler, StopPolicy, Penalties, DAYS, PERIODS_PER_DAY
+from local_search import STRATEGIES
+from engines import ENGINES, GeneticEngine
+from decompose import DecomposedEngine
+
+DEFAULT_PARAMS = {
+    "engine": "genetic",   # "genetic" | "cpsat", see engines.ENGINES
+    "parts": 1,   # > 1: split the batches into that many parts solved in parallel, see decompose.py
+    "generations": 50, "population_size": 10, "seed": None,
+    "greedy_ratio": 0.5,   # share of the initial population seeded by the greedy heuristic
+    "local_search": None, "local_search_budget": 0.05,   # "tabu" | "annealing", seconds per generation
+    "alternatives": 3, "niche_radius": 0.02,   # distinct timetables saved; clearing radius (share of slots)
+    "hard_weight": 100, "soft_weight": 5,   # score penalty per hard violation / misplaced break, see Penalties
+    # stopping rules (None = off), see StopPolicy
+    "target_fitness": None, "stagnation": None, "time_limit": None, "max_evaluations": None
+}
+PROGRESS_INTERVAL = 0.5   # seconds between progress writes to the DB
+
+
+class JobRunner:
+    """Runs generation jobs on a bounded thread pool; all job state lives in the DB."""
+
+    def __init__(self, app, max_workers=2, islands=1, ga_workers=1, run_cache=None, solver_workers=1,
+                 solver_time_limit=60):
+        self.app = app
+        self.run_cache = run_cache   # runs.RunCache that receives each finished job's page
+        self.islands = islands
+        self.ga_workers = ga_workers
+        self.solver_workers = solver_workers
+        self.solver_time_limit = solver_time_limit   # cpsat engine, when the job sets no time_limit
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ga-job")
+
+        # Live progress of this process's jobs: job id -> latest stats (None until started)
+        self.live = {}
+        self.changed = threading.Condition()
+        self.stop_requests = set()
+        self.resume_lock = threading.Lock()
+        self.resumed = False
+
+    # ---------- QUEUE ----------
+    def create(self, **params):
+        """Store a new queued job and hand it to the pool."""
+        settings = {**DEFAULT_PARAMS, **{k: v for k, v in params.items() if v is not None}}
+        job = GenerationJob(params=json.dumps(settings), generations=settings["generations"])
+        db.session.add(job)
+        db.session.commit()
+        self._submit(job.id)
+        return job
+
+    def resume(self):
+        """Re-queue jobs that were queued or running when the server stopped."""
+        with self.app.app_context():
+            jobs = GenerationJob.query.filter(GenerationJob.status.in_(["queued", "running"])).all()
+            for job in jobs:
+                job.status, job.generation, job.started_at = "queued", 0, None
+            db.session.commit()
+            for job in jobs:
+                self._submit(job.id)
+        return len(jobs)
+
+    def resume_once(self):
+        """``resume`` on the first call in this process only; later calls return None.
+
+        Creates missing tables and columns first, since the server may be started on a
+        database ``init_db.py`` never set up. Concurrent callers wait until that is done.
+        A failure is logged rather than raised (and not retried), so it cannot turn the
+        request that happened to trigger it into an error.
+        """
+        with self.resume_lock:
+            if self.resumed:
+                return None
+            self.resumed = True
+            try:
+                with self.app.app_context():
+                    create_schema()
+                return self.resume()
+            except Exception:
+                self.app.logger.exception("Could not set up the database and resume interrupted jobs")
+                return None
+
+    def _submit(self, job_id):
+        with self.changed:
+            self.live[job_id] = None
+        self.pool.submit(self._run, job_id)
+
+    def stop(self, job_id):
+        """Ask a queued/running job to stop after its current generation (keeps its best result)."""
+        self.stop_requests.add(job_id)
+
+    # ---------- LIVE PROGRESS ----------
+    def _publish(self, job_id, stats):
+        with self.changed:
+            if stats is None:
+                self.live.pop(job_id, None)
+            else:
+                self.live[job_id] = stats
+            self.changed.notify_all()
+
+    def events(self, job_id, keepalive=15):
+        """Yield ``(event, data)`` pairs for a job: "progress" stats, "ping" while idle, then "end"."""
+        last = None
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.live.get(job_id, last) is not last or job_id not in self.live,
+                                      keepalive)
+                active = job_id in self.live
+                stats = self.live.get(job_id)
+            if not active:
+                break
+            if stats is not last:
+                last = stats
+                yield "progress", stats
+            else:
+                yield "ping", None
+
+        with self.app.app_context():
+            job = db.session.get(GenerationJob, job_id)
+            yield "end", job.to_dict() if job else None
+            db.session.remove()
+
+    # ---------- WORKER ----------
+    def _run(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(GenerationJob, job_id)
+            job.status, job.started_at = "running", datetime.utcnow()
+            db.session.commit()
+
+            html = None
+            try:
+                html = self._generate(job)
+                job.status = "stopped" if job.stopped_by == "stop_requested" else "done"
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(GenerationJob, job_id)
+                job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            if html is not None and self.run_cache is not None:
+                self.run_cache.put(job.run_id, html)   # only once the run is committed
+            db.session.remove()
+            self.stop_requests.discard(job_id)
+            self._publish(job_id, None)
+
+    @staticmethod
+    def _local_search(settings):
+        name = settings.get("local_search")
+        if not name:
+            return None
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown local search {name!r}, expected one of {sorted(STRATEGIES)}")
+        return STRATEGIES[name](time_budget=settings.get("local_search_budget", 0.05))
+
+    def _engine(self, settings):
+        name = settings.get("engine") or "genetic"
+        if name not in ENGINES:
+            raise ValueError(f"Unknown engine {name!r}, expected one of {sorted(ENGINES)}")
+        parts = settings.get("parts") or 1
+        if name == "genetic":
+            # parts already run in worker processes, so each one evolves a single population
+            engine = GeneticEngine(islands=self.islands if parts == 1 else 1, workers=self.ga_workers)
+        else:
+            engine = ENGINES[name](time_limit=settings.get("time_limit") or self.solver_time_limit,
+                                   workers=self.solver_workers)
+        return DecomposedEngine(engine, parts, workers=self.ga_workers) if parts > 1 else engine
+
+    def _generate(self, job):
+        """Run the job's engine, save the result as a run and return its rendered page."""
+        settings = job.settings
+        engine = self._engine(settings)
+        snapshot = snapshot_cache.get()
+        if not snapshot.complete:
+            raise ValueError("Missing data in DB. Please add data first.")
+
+        scheduler = GeneticScheduler(
+            subjects=snapshot.schedulable_subjects,
+            faculties=snapshot.faculties,
+            batches=snapshot.batches,
+            classrooms=snapshot.classrooms,
+            days=DAYS,
+            periods_per_day=PERIODS_PER_DAY,
+            population_size=settings["population_size"],
+            vectorized=True,
+            seed=settings["seed"],
+            greedy_ratio=settings.get("greedy_ratio", 0.0),
+            local_search=self._local_search(settings),
+            special_classes=snapshot.special_classes,
+            niche_radius=settings.get("niche_radius"),
+            penalties=Penalties.from_settings(settings)
+        )
+
+        last_write = [0.0]
+
+        def progress(stats):
+            self._publish(job.id, stats)
+            job.generation = stats["generation"]
+            now = time.monotonic()
+            if now - last_write[0] >= PROGRESS_INTERVAL:
+                job.best_fitness = stats["best_fitness"]
+                db.session.commit()
+                last_write[0] = now
+            return job.id in self.stop_requests
+
+        stop = StopPolicy(target_fitness=settings["target_fitness"], stagnation=settings["stagnation"],
+                          time_limit=settings["time_limit"], max_evaluations=settings["max_evaluations"])
+        top_k = max(1, settings.get("alternatives", 1))
+        options = engine.solve(scheduler, job.generations, on_generation=progress, stop=stop, top_k=top_k)
+        best = options[0]
+
+        job.best_fitness = scheduler.score(best)
+        job.stopped_by = "stop_requested" if scheduler.stats["stopped_by"] == "callback" else scheduler.stats["stopped_by"]
+        job.run_stats = json.dumps({**scheduler.stats, "skipped_special_classes": scheduler.skipped_pins})
+        for rank, genome in enumerate(options, 1):
+            run = save_run(scheduler, genome, settings, job_id=job.id, rank=rank,
+                           differences=scheduler.differences(best, genome) if rank > 1 else None)
+            if rank == 1:
+                job.run_id, html = run.id, run.page
+        return html
@@ -0,0 +1,238 @@
+# local_search.py
+# Local-search stage for GeneticScheduler: every generation the elite genomes get a
+# short, time-boxed search of targeted moves, each aimed at one reported conflict
+# (a faculty/room double booking, a repeated subject or a misplaced break).
+import math
+import time
+
+import numpy as np
+
+from genetic_scheduler import Genome, BREAK, BREAK_SLOTS
+
+
+def energy(state, penalties):
+    """Value minimized by the search: the scheduler's weighted penalty of the counters."""
+    return penalties.penalty(*state.counts)
+
+
+class _Walk:
+    """Mutable copy of a genome and its counters; moves are applied and undone in O(1)."""
+
+    def __init__(self, scheduler, genome):
+        self.scheduler = scheduler
+        self.subjects = genome.subjects.copy()
+        self.rooms = genome.rooms.copy()
+        self.state = scheduler._state(genome).copy()
+        self.shape = (len(scheduler.days), scheduler.periods_per_day)
+
+    @property
+    def energy(self):
+        return energy(self.state, self.scheduler.penalties)
+
+    def apply(self, changes):
+        """Set each ``(b, d, p, subject, room)`` cell and return the changes that undo it."""
+        undo = []
+        for b, d, p, subject, room in changes:
+            old = int(self.subjects[b, d, p]), int(self.rooms[b, d, p])
+            undo.append((b, d, p) + old)
+            self.scheduler._move(self.state, b, d, p, old, (subject, room))
+            if p in self.scheduler.bad_break_periods:   # breaks only move within their row
+                self.state.misplaced_breaks += (subject == BREAK) - (old[0] == BREAK)
+            self.subjects[b, d, p], self.rooms[b, d, p] = subject, room
+        return undo[::-1]
+
+    def swap(self, b, d, p, d2, p2):
+        """Changes that exchange cells (b, d, p) and (b, d2, p2)."""
+        return [(b, d, p, int(self.subjects[b, d2, p2]), int(self.rooms[b, d2, p2])),
+                (b, d2, p2, int(self.subjects[b, d, p]), int(self.rooms[b, d, p]))]
+
+    def conflicts(self):
+        """``(kind, b, d, p)`` for every cell involved in a reported conflict."""
+        scheduler, state = self.scheduler, self.state
+        n_days, n_periods = self.shape
+        found = []
+        taught = self.subjects != BREAK
+        faculty = np.where(taught, scheduler.subject_faculty[np.where(taught, self.subjects, 0)], -1)
+
+        for kind, counts, owner in (("faculty", state.faculty_busy, faculty), ("room", state.room_busy, self.rooms)):
+            for key in np.flatnonzero(counts > 1).tolist():
+                i, slot = divmod(key, n_days * n_periods)
+                d, p = divmod(slot, n_periods)
+                found.extend((kind, b, d, p) for b in np.flatnonzero(owner[:, d, p] == i).tolist())
+
+        for key in np.flatnonzero(state.subject_day > 1).tolist():
+            row, s = divmod(key, len(scheduler.subjects))
+            b, d = divmod(row, n_days)
+            found.extend(("repeat", b, d, p) for p in np.flatnonzero(self.subjects[b, d] == s).tolist())
+
+        if not found:
+            for b, d, p in zip(*np.nonzero(self.subjects[:, :, scheduler.bad_break_periods] == BREAK)):
+                found.append(("break", int(b), int(d), scheduler.bad_break_periods[p]))
+        return found
+
+    def moves(self, conflict, rnd, limit):
+        """Up to ``limit`` candidate change lists that may remove ``conflict``."""
+        kind, b, d, p = conflict
+        scheduler = self.scheduler
+        n_days, n_periods = self.shape
+        subject, room = int(self.subjects[b, d, p]), int(self.rooms[b, d, p])
+        moves = []
+
+        locked = scheduler.locked
+        if locked[b, d, p]:
+            return moves   # a special class never moves; the other side of the conflict will
+        if kind == "break":
+            return [self.swap(b, d, p, d, q) for q in BREAK_SLOTS
+                    if self.subjects[b, d, q] != BREAK and not locked[b, d, q]]
+
+        if kind == "room":
+            free = np.flatnonzero(self.state.room_busy.reshape(-1, n_days, n_periods)[:, d, p] == 0).tolist()
+            moves += [[(b, d, p, subject, r)] for r in rnd.sample(free, min(limit, len(free)))]
+            return moves
+
+        # faculty clash / repeat: move the class elsewhere in the batch's week ...
+        for _ in range(limit):
+            d2, p2 = rnd.randrange(n_days), rnd.randrange(n_periods)
+            if (d2, p2) != (d, p) and self.subjects[b, d2, p2] != BREAK and not locked[b, d2, p2]:
+                moves.append(self.swap(b, d, p, d2, p2))
+        # ... or teach a subject whose faculty is free then and that is not on that day yet
+        busy = self.state.faculty_busy.reshape(-1, n_days, n_periods)[:, d, p]
+        on_day = set(self.subjects[b, d].tolist())
+        options = [s for s in range(len(scheduler.subjects))
+                   if s not in on_day and busy[scheduler.subject_faculty[s]] == 0]
+        moves += [[(b, d, p, s, room)] for s in rnd.sample(options, min(limit, len(options)))]
+        return moves
+
+    def genome(self):
+        return Genome(self.subjects.copy(), self.rooms.copy(), self.state.copy())
+
+
+class LocalSearch:
+    """Improve the ``elites`` best genomes of each generation.
+
+    The stage gets ``time_budget`` seconds per generation, split across the elites,
+    and/or at most ``max_steps`` moves per elite (use ``max_steps`` alone for
+    reproducible runs). Subclasses implement ``search``.
+    """
+
+    def __init__(self, elites=2, time_budget=0.05, max_steps=None, candidates=8):
+        self.elites = elites
+        self.time_budget = time_budget
+        self.max_steps = max_steps
+        self.candidates = candidates   # moves tried per conflict
+
+    def apply(self, scheduler, ranked):
+        """Return ``ranked`` with its elites replaced by their improved versions, re-sorted."""
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        elites = ranked[:self.elites]
+        improved = []
+        for i, genome in enumerate(elites):
+            end = None
+            if deadline is not None:
+                now = time.perf_counter()
+                end = now + max(0.0, deadline - now) / (len(elites) - i)
+            improved.append(self.improve(scheduler, genome, end))
+        return sorted(improved + ranked[self.elites:], key=scheduler.score, reverse=True)
+
+    def improve(self, scheduler, genome, deadline):
+        walk = _Walk(scheduler, genome)
+        start_energy = walk.energy
+        if start_energy == 0:
+            return genome
+        best = self.search(walk, scheduler.random, deadline, scheduler.stats)
+        return best.freeze() if best is not None and energy(best.state, scheduler.penalties) < start_energy else genome
+
+    def steps(self, deadline):
+        """Step counter that ends at ``max_steps`` or at the deadline."""
+        step = 0
+        while (self.max_steps is None or step < self.max_steps) and \
+                (deadline is None or time.perf_counter() < deadline):
+            yield step
+            step += 1
+
+    def search(self, walk, rnd, deadline, stats):
+        """Run the search on ``walk`` and return the best Genome found (or None)."""
+        raise NotImplementedError
+
+
+class TabuSearch(LocalSearch):
+    """Take the best non-tabu move for a random conflict each step, even if it is worse.
+
+    Cells changed in the last ``tenure`` steps are tabu unless a move through them
+    beats the best energy seen so far (aspiration).
+    """
+
+    def __init__(self, tenure=10, **kwargs):
+        super().__init__(**kwargs)
+        self.tenure = tenure
+
+    def search(self, walk, rnd, deadline, stats):
+        best, best_energy = None, walk.energy
+        tabu = {}   # (b, d, p) -> step it stops being tabu
+        for step in self.steps(deadline):
+            conflicts = walk.conflicts()
+            if not conflicts:
+                break
+            chosen, chosen_energy = None, None
+            for changes in walk.moves(rnd.choice(conflicts), rnd, self.candidates):
+                undo = walk.apply(changes)
+                after = walk.energy
+                walk.apply(undo)
+                stats["fitness_evaluations"] += 1
+                is_tabu = any(tabu.get(change[:3], -1) > step for change in changes)
+                if (not is_tabu or after < best_energy) and (chosen is None or after < chosen_energy):
+                    chosen, chosen_energy = changes, after
+            if chosen is None:
+                continue
+            walk.apply(chosen)
+            for change in chosen:
+                tabu[change[:3]] = step + self.tenure
+            if chosen_energy < best_energy:
+                best, best_energy = walk.genome(), chosen_energy
+        return best
+
+
+class SimulatedAnnealing(LocalSearch):
+    """Try one random move for a random conflict each step; accept worse moves with
+    probability exp(-delta / T), where T starts at ``temperature`` and decays by ``cooling``.
+
+    The energy is in Penalties units, so by default the start temperature follows the
+    weights: a move adding one violation of the heaviest type is first accepted with
+    probability ``acceptance``.
+    """
+
+    def __init__(self, temperature=None, acceptance=0.5, cooling=0.995, **kwargs):
+        super().__init__(**kwargs)
+        self.temperature = temperature
+        self.acceptance = acceptance
+        self.cooling = cooling
+
+    def start_temperature(self, penalties):
+        if self.temperature is not None:
+            return self.temperature
+        return max(penalties.weights) / -math.log(self.acceptance)
+
+    def search(self, walk, rnd, deadline, stats):
+        best, best_energy = None, walk.energy
+        current, t = best_energy, self.start_temperature(walk.scheduler.penalties)
+        for _ in self.steps(deadline):
+            conflicts = walk.conflicts()
+            if not conflicts:
+                break
+            moves = walk.moves(rnd.choice(conflicts), rnd, 1)
+            t *= self.cooling
+            if not moves:
+                continue
+            undo = walk.apply(rnd.choice(moves))
+            after = walk.energy
+            stats["fitness_evaluations"] += 1
+            if after <= current or rnd.random() < math.exp((current - after) / max(t, 1e-9)):
+                current = after
+                if after < best_energy:
+                    best, best_energy = walk.genome(), after
+            else:
+                walk.apply(undo)
+        return best
+
+
+STRATEGIES = {"tabu": TabuSearch, "annealing": SimulatedAnnealing}
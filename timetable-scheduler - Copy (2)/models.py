@@ -1,3 +1,6 @@
+from datetime import datetime
+import json
+
 from db_extensions import db   # keep consistent import
 
 
@@ -20,7 +23,8 @@ class Faculty(db.Model):
     # ✅ Add this field
     avg_leaves_per_month = db.Column(db.Integer, nullable=False, default=0)
 
-    subjects = db.relationship("Subject", backref="faculty", lazy=True)
+    # a subject's faculty is joined into the same query instead of lazy-loaded per row
+    subjects = db.relationship("Subject", backref=db.backref("faculty", lazy="joined"), lazy=True)
 
     def __repr__(self):
         return f"<Faculty {self.name}>"
@@ -60,19 +64,67 @@ class SpecialClass(db.Model):
     day = db.Column(db.String(20), nullable=False)   # e.g. "Monday"
     period = db.Column(db.Integer, nullable=False)   # e.g. 1–12
 
-    # Relationships (for easier joins)
-    subject = db.relationship("Subject", backref="special_classes")
-    batch = db.relationship("Batch", backref="special_classes")
-    classroom = db.relationship("Classroom", backref="special_classes")
+    # Relationships (for easier joins) - loaded with the row so __repr__ and templates don't N+1
+    subject = db.relationship("Subject", backref="special_classes", lazy="joined")
+    batch = db.relationship("Batch", backref="special_classes", lazy="joined")
+    classroom = db.relationship("Classroom", backref="special_classes", lazy="joined")
 
     def __repr__(self):
         return f"<SpecialClass {self.subject.name} - {self.batch.name} on {self.day} (Period {self.period})>"
 
 
+class TimetableRun(db.Model):
+    """Header of one saved generation result; its slots are the Timetable rows with this run_id."""
+    __tablename__ = "timetable_run"
+
+    id = db.Column(db.Integer, primary_key=True)   # doubles as the timetable version
+    job_id = db.Column(db.Integer, db.ForeignKey("generation_job.id"))
+    params = db.Column(db.Text, nullable=False, default="{}")   # JSON: GA settings used
+    seed = db.Column(db.Integer)
+    fitness = db.Column(db.Float)
+    hard_violations = db.Column(db.Integer)
+    generations = db.Column(db.Integer)
+    periods_per_day = db.Column(db.Integer)
+    elapsed = db.Column(db.Float)   # seconds spent generating
+    stopped_by = db.Column(db.String(30))
+    rank = db.Column(db.Integer, default=1)   # among the alternatives of one job, 1 = best
+    differences = db.Column(db.Text)          # JSON: batch name -> slots changed vs. rank 1
+    page = db.deferred(db.Column(db.Text))    # timetable page rendered when saved (None for older runs)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    entries = db.relationship("Timetable", backref="run", lazy="dynamic")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "params": json.loads(self.params),
+            "seed": self.seed,
+            "fitness": self.fitness,
+            "hard_violations": self.hard_violations,
+            "generations": self.generations,
+            "periods_per_day": self.periods_per_day,
+            "elapsed": self.elapsed,
+            "stopped_by": self.stopped_by,
+            "rank": self.rank,
+            "differences": json.loads(self.differences) if self.differences else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f"<TimetableRun {self.id} fitness={self.fitness}>"
+
+
 class Timetable(db.Model):
     __tablename__ = "timetable"
+    __table_args__ = (
+        db.Index("ix_timetable_run_slot", "run_id", "batch_id", "day", "period"),
+        db.Index("ix_timetable_faculty_slot", "faculty_id", "day", "period"),
+        db.Index("ix_timetable_room_slot", "classroom_id", "day", "period"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("timetable_run.id"))
     classroom_id = db.Column(db.Integer, db.ForeignKey("classroom.id"))
     subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"))
     batch_id = db.Column(db.Integer, db.ForeignKey("batch.id"))
@@ -85,5 +137,66 @@ class Timetable(db.Model):
     batch = db.relationship("Batch", backref="timetables")
     faculty = db.relationship("Faculty", backref="timetables")
 
+    def to_dict(self):
+        return {
+            "batch_id": self.batch_id,
+            "day": self.day,
+            "period": self.period,
+            "subject_id": self.subject_id,
+            "faculty_id": self.faculty_id,
+            "classroom_id": self.classroom_id,
+        }
+
     def __repr__(self):
         return f"<Timetable {self.day} Period {self.period}>"
+
+
+class GenerationJob(db.Model):
+    """A background timetable generation run (see jobs.py)."""
+    __tablename__ = "generation_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")   # queued / running / done / failed
+    params = db.Column(db.Text, nullable=False, default="{}")             # JSON: GA settings + stopping rules
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    generations = db.Column(db.Integer, nullable=False)
+    best_fitness = db.Column(db.Float)
+    stopped_by = db.Column(db.String(30))   # stopping rule that ended the run
+    run_stats = db.Column(db.Text)          # JSON copy of GeneticScheduler.stats
+    result_html = db.Column(db.Text)
+    error = db.Column(db.Text)
+    run_id = db.Column(db.Integer)          # TimetableRun holding the saved result
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def settings(self):
+        return json.loads(self.params)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.settings,
+            "generation": self.generation,
+            "generations": self.generations,
+            "best_fitness": self.best_fitness,
+            "stopped_by": self.stopped_by,
+            "run_stats": json.loads(self.run_stats) if self.run_stats else None,
+            "error": self.error,
+            "run_id": self.run_id,
+            "alternatives": [
+                {"run_id": run.id, "rank": run.rank, "fitness": run.fitness,
+                 "hard_violations": run.hard_violations,
+                 "differences": json.loads(run.differences) if run.differences else None}
+                for run in TimetableRun.query.filter_by(job_id=self.id).order_by(TimetableRun.rank)
+            ],
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<GenerationJob {self.id} {self.status}>"
@@ -0,0 +1,256 @@
+# repair.py
+# Minimal-change re-scheduling of a saved run when a faculty member is on leave or a
+# room is closed. Only the affected slots move: each one is swapped with another class
+# of the same batch, given a free room, or (last resort) handed to a substitute subject.
+# A move never adds hard violations: when every move would, a short tabu search over
+# the batch-day rows it touches tries to absorb them, and otherwise the slot is reported.
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from genetic_scheduler import GeneticScheduler, Genome, Penalties, BREAK, DAYS, ALL_DAYS
+from local_search import _Walk, TabuSearch
+from runs import run_entries, save_run
+from snapshot import snapshot_cache
+
+LOST_CLASS_COST = 1.5   # a substitution changes one slot but also drops a class from its subject's week
+SETTLE_STEPS = 200      # tabu steps spent re-optimising the rows around a move that adds hard violations
+
+
+def disruption_days(days=None, start_date=None, end_date=None):
+    """Teaching-day indexes hit by a disruption given as day names or an ISO date range."""
+    names = set(days or ())
+    if start_date:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date) if end_date else start
+        if end < start:
+            raise ValueError("end_date is before start_date")
+        for offset in range(min((end - start).days + 1, 7)):   # a week covers every weekday
+            names.add(ALL_DAYS[(start + timedelta(days=offset)).weekday()])
+    unknown = names - set(ALL_DAYS)
+    if unknown:
+        raise ValueError(f"Unknown day(s): {', '.join(sorted(unknown))}")
+    if not names:
+        raise ValueError("Give the disrupted days or a start_date / end_date range")
+    indexes = sorted(DAYS.index(name) for name in names if name in DAYS)
+    if not indexes:
+        raise ValueError(f"The disruption falls on no teaching day ({', '.join(DAYS)}); nothing to repair")
+    return indexes
+
+
+def load_genome(scheduler, run):
+    """Genome of a saved run (slots without a row are breaks)."""
+    index = {
+        "batch": {b.id: i for i, b in enumerate(scheduler.batches)},
+        "subject": {s.id: i for i, s in enumerate(scheduler.subjects)},
+        "classroom": {c.id: i for i, c in enumerate(scheduler.classrooms)},
+    }
+    subjects = np.full(scheduler.shape, BREAK, dtype=np.int16)
+    rooms = np.full(scheduler.shape, BREAK, dtype=np.int16)
+    for entry in run_entries(run.id):
+        try:
+            b = index["batch"][entry.batch_id]
+            cell = (b, scheduler.days.index(entry.day), entry.period - 1)
+            subjects[cell] = index["subject"][entry.subject_id]
+            rooms[cell] = index["classroom"][entry.classroom_id]
+        except (KeyError, ValueError, IndexError):
+            raise ValueError(f"Run #{run.id} refers to data that no longer exists; generate a new timetable")
+    return Genome(subjects, rooms)
+
+
+def run_violations(run):
+    """Structured violation records of a saved run, checked against the current data."""
+    snapshot = snapshot_cache.get()
+    scheduler = GeneticScheduler(snapshot.schedulable_subjects, snapshot.faculties, snapshot.batches,
+                                 snapshot.classrooms, DAYS, run.periods_per_day)
+    return scheduler.violations(load_genome(scheduler, run))
+
+
+class _RowWalk(_Walk):
+    """_Walk whose conflicts and moves can be confined to some (batch, day) rows.
+
+    Moves that would put a class into the disruption (``blocked``) are never offered.
+    """
+
+    def __init__(self, scheduler, genome, blocked):
+        super().__init__(scheduler, genome)
+        self.blocked = blocked
+        self.rows = None   # set of (b, d) the search may touch; None = everywhere
+
+    def conflicts(self):
+        found = super().conflicts()
+        return found if self.rows is None else [c for c in found if (c[1], c[2]) in self.rows]
+
+    def moves(self, conflict, rnd, limit):
+        return [changes for changes in super().moves(conflict, rnd, limit)
+                if all((self.rows is None or (b, d) in self.rows) and not self.blocked(d, s, r)
+                       for b, d, _, s, r in changes)]
+
+
+class _Repair:
+    """Greedy, cheapest-first re-placement of the slots a disruption makes unusable."""
+
+    def __init__(self, scheduler, genome, faculty=None, room=None, days=()):
+        self.scheduler = scheduler
+        self.walk = _RowWalk(scheduler, genome, self.blocked)
+        self.faculty, self.room, self.days = faculty, room, set(days)
+        self.leaves = [f.avg_leaves_per_month for f in scheduler.faculties]
+
+    def blocked(self, d, subject, room):
+        """True if a class of ``subject`` in ``room`` on day ``d`` hits the disruption."""
+        if d not in self.days or subject == BREAK:
+            return False
+        return self.scheduler.subject_faculty[subject] == self.faculty or room == self.room
+
+    def affected(self):
+        subjects, rooms = self.walk.subjects, self.walk.rooms
+        return [(b, d, p) for b, d, p in zip(*(axis.tolist() for axis in np.nonzero(subjects != BREAK)))
+                if self.blocked(d, int(subjects[b, d, p]), int(rooms[b, d, p]))]
+
+    def candidates(self, b, d, p):
+        """``(changes, cost, faculty leaves)`` for moving the class at (b, d, p) out of the disruption."""
+        walk, scheduler = self.walk, self.scheduler
+        n_days, n_periods = walk.shape
+        subject, room = int(walk.subjects[b, d, p]), int(walk.rooms[b, d, p])
+        locked = scheduler.locked
+
+        # swap with another class of the batch: both classes keep their faculty and weekly count
+        for d2 in range(n_days):
+            for p2 in range(n_periods):
+                if (d2, p2) != (d, p) and walk.subjects[b, d2, p2] != BREAK and not locked[b, d2, p2]:
+                    yield walk.swap(b, d, p, d2, p2), 2, 0
+
+        busy_rooms = walk.state.room_busy.reshape(-1, n_days, n_periods)[:, d, p]
+        if scheduler.subject_faculty[subject] != self.faculty:   # only the room is the problem
+            for r in np.flatnonzero(busy_rooms == 0).tolist():
+                yield [(b, d, p, subject, r)], 1, 0
+            return
+
+        # substitute: a subject whose faculty is free then and not yet on that day
+        busy_faculty = walk.state.faculty_busy.reshape(-1, n_days, n_periods)[:, d, p]
+        on_day = set(walk.subjects[b, d].tolist())
+        for s in range(len(scheduler.subjects)):
+            f = int(scheduler.subject_faculty[s])
+            if s not in on_day and busy_faculty[f] == 0 and f != self.faculty:
+                yield [(b, d, p, s, room)], 1 + LOST_CLASS_COST, self.leaves[f]
+
+    def settle(self, changes, hard_violations):
+        """Tabu search over the rows ``changes`` touched until at most ``hard_violations`` are left.
+
+        Keeps the search's best timetable and returns True if it gets there; otherwise
+        the walk is left as it was and False is returned.
+        """
+        walk = self.walk
+        saved = walk.subjects.copy(), walk.rooms.copy(), walk.state.copy()
+        walk.rows = {(b, d) for b, d, *_ in changes}
+        try:
+            search = TabuSearch(time_budget=None, max_steps=SETTLE_STEPS)
+            best = search.search(walk, self.scheduler.random, None, self.scheduler.stats)
+        finally:
+            walk.rows = None
+        if best is not None and best.state.hard_violations <= hard_violations:
+            walk.subjects, walk.rooms, walk.state = best.subjects, best.rooms, best.state
+            return True
+        walk.subjects, walk.rooms, walk.state = saved
+        return False
+
+    def run(self):
+        """Re-place every affected slot; returns the cells that could not be cleared."""
+        unresolved = []
+        for b, d, p in self.affected():
+            if not self.blocked(d, int(self.walk.subjects[b, d, p]), int(self.walk.rooms[b, d, p])):
+                continue   # already moved away as another slot's swap partner
+            if self.scheduler.locked[b, d, p]:
+                unresolved.append((b, d, p))
+                continue
+            best, best_key = None, None
+            before = self.walk.state.hard_violations
+            for changes, cost, leaves in self.candidates(b, d, p):
+                if any(self.blocked(cd, s, r) for _, cd, _, s, r in changes):
+                    continue
+                undo = self.walk.apply(changes)
+                key = (self.walk.state.hard_violations - before, cost, leaves)
+                self.walk.apply(undo)
+                if best_key is None or key < best_key:
+                    best, best_key = changes, key
+            if best is None:
+                unresolved.append((b, d, p))
+                continue
+            undo = self.walk.apply(best)
+            if best_key[0] > 0 and not self.settle(best, before):
+                self.walk.apply(undo)   # every move adds hard violations: leave the class and report it
+                unresolved.append((b, d, p))
+        return unresolved
+
+
+def repair_run(run, faculty_id=None, classroom_id=None, days=None, start_date=None, end_date=None):
+    """Save a repaired copy of ``run`` as a new run and describe what changed (caller commits)."""
+    if (faculty_id is None) == (classroom_id is None):
+        raise ValueError("Give exactly one of faculty_id or classroom_id")
+    start = time.perf_counter()
+    snapshot = snapshot_cache.get()
+    settings = json.loads(run.params)
+    scheduler = GeneticScheduler(snapshot.schedulable_subjects, snapshot.faculties, snapshot.batches,
+                                 snapshot.classrooms, DAYS, run.periods_per_day, seed=settings.get("seed"),
+                                 penalties=Penalties.from_settings(settings))
+
+    faculty = room = None
+    if faculty_id is not None:
+        if faculty_id not in snapshot.faculties_by_id:
+            raise ValueError(f"No faculty #{faculty_id}")
+        faculty = scheduler.faculty_index[faculty_id]
+    else:
+        if classroom_id not in snapshot.classrooms_by_id:
+            raise ValueError(f"No room #{classroom_id}")
+        room = [c.id for c in scheduler.classrooms].index(classroom_id)
+    day_indexes = disruption_days(days, start_date, end_date)
+
+    original = load_genome(scheduler, run)
+    # special classes that are still in place stay where they are
+    batch_index = {b.id: i for i, b in enumerate(scheduler.batches)}
+    for sc in snapshot.special_classes:
+        if sc.batch_id not in batch_index or sc.day not in DAYS or not 1 <= sc.period <= run.periods_per_day:
+            continue
+        cell = (batch_index[sc.batch_id], DAYS.index(sc.day), sc.period - 1)
+        s = int(original.subjects[cell])
+        if s != BREAK and scheduler.subjects[s].id == sc.subject_id:
+            scheduler.locked[cell] = True
+
+    repair = _Repair(scheduler, original, faculty, room, day_indexes)
+    affected = repair.affected()
+    unresolved = repair.run()
+    repaired = repair.walk.genome()
+    scheduler.stats.update(elapsed=round(time.perf_counter() - start, 3), stopped_by="repair")
+
+    disruption = {"faculty_id": faculty_id, "classroom_id": classroom_id, "days": [DAYS[d] for d in day_indexes]}
+    new_run = save_run(scheduler, repaired, {**settings, "repair_of": run.id, "disruption": disruption},
+                       differences=scheduler.differences(original, repaired))
+
+    changed = np.nonzero((original.subjects != repaired.subjects) | (original.rooms != repaired.rooms))
+
+    def describe(genome, b, d, p):
+        s, r = int(genome.subjects[b, d, p]), int(genome.rooms[b, d, p])
+        if s == BREAK:
+            return None
+        return {"subject_id": scheduler.subjects[s].id, "classroom_id": scheduler.classrooms[r].id,
+                "faculty_id": scheduler.faculties[scheduler.subject_faculty[s]].id}
+
+    return {
+        "run_id": new_run.id,
+        "repair_of": run.id,
+        "disruption": disruption,
+        "affected_slots": len(affected),
+        "changes": [
+            {"batch_id": scheduler.batches[b].id, "day": DAYS[d], "period": p + 1,
+             "before": describe(original, b, d, p), "after": describe(repaired, b, d, p)}
+            for b, d, p in zip(*(axis.tolist() for axis in changed))
+        ],
+        "unresolved": [{"batch_id": scheduler.batches[b].id, "day": DAYS[d], "period": p + 1}
+                       for b, d, p in unresolved],
+        "fitness": new_run.fitness,
+        "hard_violations": new_run.hard_violations,
+        "violations": [v._asdict() for v in scheduler.violations(repaired)],
+        "elapsed": scheduler.stats["elapsed"],
+    }
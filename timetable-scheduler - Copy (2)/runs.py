@@ -0,0 +1,138 @@
+# runs.py
+# Saved timetable runs: a TimetableRun header plus one Timetable row per taught slot
+# and the page rendered at save time, and an in-memory LRU of those pages.
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from db_extensions import db
+from models import TimetableRun, Timetable
+from snapshot import snapshot_cache
+from genetic_scheduler import DAYS, render_timetable_html
+
+
+def save_run(scheduler, genome, settings, job_id=None, rank=1, differences=None):
+    """Add ``genome`` as a new run: header row + one bulk insert of its slots.
+
+    ``rank`` orders the alternatives saved for one job (1 = best) and ``differences``
+    maps batch names to slots changed compared with the best one.
+
+    The rendered page is stored with the run, so it keeps showing the names the
+    timetable was made with. Nothing is committed here, so the run lands in the
+    caller's transaction together with whatever else it updates (e.g. the job row).
+    """
+    run = TimetableRun(
+        job_id=job_id,
+        params=json.dumps(settings),
+        seed=settings.get("seed"),
+        fitness=scheduler.score(genome),
+        hard_violations=scheduler._state(genome).hard_violations,
+        generations=scheduler.stats["generations"],
+        periods_per_day=scheduler.periods_per_day,
+        elapsed=scheduler.stats["elapsed"],
+        stopped_by=scheduler.stats["stopped_by"],
+        rank=rank,
+        differences=json.dumps(differences) if differences is not None else None
+    )
+    db.session.add(run)
+    db.session.flush()   # assigns run.id
+    run.page = scheduler.pretty_table(genome, download_url(run.id))
+
+    rows = [dict(slot, run_id=run.id) for slot in scheduler.assignments(genome)]
+    if rows:
+        db.session.execute(insert(Timetable), rows)   # executemany, no ORM objects
+    return run
+
+
+def _entries_query(run_id, batch_id=None, faculty_id=None, classroom_id=None):
+    query = Timetable.query.filter_by(run_id=run_id)
+    for column, value in (("batch_id", batch_id), ("faculty_id", faculty_id), ("classroom_id", classroom_id)):
+        if value is not None:
+            query = query.filter(getattr(Timetable, column) == value)
+    return query
+
+
+def run_entries(run_id, **filters):
+    """Slots of a run, optionally for one batch, faculty or room (each served by a composite index)."""
+    return _entries_query(run_id, **filters).order_by(Timetable.id).all()   # insertion order: batch, day, period
+
+
+def iter_run_entries(run_id, group_by="batch_id", chunk_size=500, **filters):
+    """Like ``run_entries`` but grouped by ``group_by`` and fetched ``chunk_size`` rows at a time."""
+    query = _entries_query(run_id, **filters).order_by(getattr(Timetable, group_by), Timetable.id)
+    return query.yield_per(chunk_size)
+
+
+def download_url(run_id):
+    return f"/runs/{run_id}/download"
+
+
+def _missing(row_id):
+    """Stand-in for an entity deleted since the run was saved, shown as "?" like the exporters do."""
+    return SimpleNamespace(id=row_id, name="?", course_code="?")
+
+
+def render_run(run):
+    """HTML page of a run saved without one, rebuilt from its Timetable rows and the current names.
+
+    Slots without a row are breaks; a subject, faculty, room or batch deleted since
+    is shown as "?".
+    """
+    snapshot = snapshot_cache.get()
+    entries = run_entries(run.id)
+    periods_per_day = run.periods_per_day or max((e.period for e in entries), default=0)
+    timetable, missing_batches = {}, {}
+    for entry in entries:
+        batch = (snapshot.batches_by_id.get(entry.batch_id)
+                 or missing_batches.setdefault(entry.batch_id, _missing(entry.batch_id)))
+        days = timetable.setdefault(batch, {
+            day: [{"subject": "BREAK", "faculty": None, "batch": batch, "classroom": None}
+                  for _ in range(periods_per_day)]
+            for day in DAYS
+        })
+        if entry.day in days and 1 <= entry.period <= periods_per_day:
+            days[entry.day][entry.period - 1] = {
+                "subject": snapshot.subjects_by_id.get(entry.subject_id) or _missing(entry.subject_id),
+                "faculty": snapshot.faculties_by_id.get(entry.faculty_id) or _missing(entry.faculty_id),
+                "batch": batch,
+                "classroom": snapshot.classrooms_by_id.get(entry.classroom_id) or _missing(entry.classroom_id)}
+    return render_timetable_html(timetable, periods_per_day, download_url(run.id))
+
+
+class RunCache:
+    """Rendered run pages keyed by run id, least recently used evicted past ``capacity``.
+
+    A miss serves the page stored with the run, so a run renders the same (with the
+    same ETag) before and after eviction, whatever was edited since. Only runs saved
+    before pages were stored are rebuilt by ``render_run`` with the current names.
+    """
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self.pages = OrderedDict()   # run id -> (html, etag)
+        self.lock = threading.Lock()
+
+    def put(self, run_id, html):
+        page = (html, hashlib.sha1(html.encode("utf-8")).hexdigest())
+        with self.lock:
+            self.pages[run_id] = page
+            self.pages.move_to_end(run_id)
+            while len(self.pages) > self.capacity:
+                self.pages.popitem(last=False)
+        return page
+
+    def get(self, run_id):
+        """``(html, etag)`` of a run, or None if there is no such run."""
+        with self.lock:
+            page = self.pages.get(run_id)
+            if page is not None:
+                self.pages.move_to_end(run_id)
+                return page
+        run = db.session.get(TimetableRun, run_id)
+        if run is None:
+            return None
+        return self.put(run_id, run.page or render_run(run))
@@ -0,0 +1,194 @@
+# snapshot.py
+# One-shot loader for every scheduling input. The ORM rows are copied into
+# read-only slotted records with their references already resolved, so the
+# scheduler and the list templates never trigger lazy loads. ``snapshot_cache`` keeps
+# the last snapshot in memory and reloads only the entity types written since.
+import threading
+import time
+
+from sqlalchemy.orm import lazyload
+
+from config import SNAPSHOT_MAX_AGE
+from models import Faculty, Subject, Batch, Classroom, SpecialClass
+
+
+class _Record:
+    """Read-only copy of a DB row; fields are set once in __init__."""
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id}>"
+
+
+class FacultyRecord(_Record):
+    __slots__ = ("id", "name", "max_classes_per_day", "avg_leaves_per_month")
+
+
+class SubjectRecord(_Record):
+    __slots__ = ("id", "name", "course_code", "faculty_id", "classes_per_week", "faculty")
+
+
+class BatchRecord(_Record):
+    __slots__ = ("id", "name", "num_students")
+
+
+class ClassroomRecord(_Record):
+    __slots__ = ("id", "name", "capacity")
+
+
+class SpecialClassRecord(_Record):
+    __slots__ = ("id", "subject_id", "batch_id", "room_id", "day", "period", "subject", "batch", "classroom")
+
+
+class Snapshot:
+    """Immutable scheduling inputs: tuples in DB order plus ``*_by_id`` indexes.
+
+    ``subjects`` lists every subject, including ones whose faculty was deleted
+    (``faculty`` is None) so they can still be edited; ``schedulable_subjects`` is
+    the subset a scheduler can be built from.
+
+    ``version`` is the SnapshotCache version it was built at (None when loaded directly).
+    """
+    __slots__ = ("faculties", "subjects", "batches", "classrooms", "special_classes",
+                 "schedulable_subjects", "faculties_by_id", "subjects_by_id", "batches_by_id", "classrooms_by_id",
+                 "version")
+
+    def __init__(self, faculties, subjects, batches, classrooms, special_classes, version=None):
+        self.faculties = tuple(faculties)
+        self.subjects = tuple(subjects)
+        self.batches = tuple(batches)
+        self.classrooms = tuple(classrooms)
+        self.special_classes = tuple(special_classes)
+        self.schedulable_subjects = tuple(s for s in self.subjects if s.faculty is not None)
+        self.faculties_by_id = {f.id: f for f in self.faculties}
+        self.subjects_by_id = {s.id: s for s in self.subjects}
+        self.batches_by_id = {b.id: b for b in self.batches}
+        self.classrooms_by_id = {c.id: c for c in self.classrooms}
+        self.version = version
+
+    @property
+    def complete(self):
+        """True when there is enough data to generate a timetable."""
+        return bool(self.schedulable_subjects and self.faculties and self.batches and self.classrooms)
+
+
+# ---------- LOADERS ----------
+# One query per entity type; a loader gets the collections loaded before it to link references.
+def _load_faculties(loaded):
+    return [FacultyRecord(id=f.id, name=f.name, max_classes_per_day=f.max_classes_per_day,
+                          avg_leaves_per_month=f.avg_leaves_per_month)
+            for f in Faculty.query.options(lazyload("*")).order_by(Faculty.id)]
+
+
+def _load_subjects(loaded):
+    faculties_by_id = {f.id: f for f in loaded["faculties"]}
+    return [SubjectRecord(id=s.id, name=s.name, course_code=s.course_code, faculty_id=s.faculty_id,
+                          classes_per_week=s.classes_per_week, faculty=faculties_by_id.get(s.faculty_id))
+            for s in Subject.query.options(lazyload("*")).order_by(Subject.id)]
+
+
+def _load_batches(loaded):
+    return [BatchRecord(id=b.id, name=b.name, num_students=b.num_students)
+            for b in Batch.query.order_by(Batch.id)]
+
+
+def _load_classrooms(loaded):
+    return [ClassroomRecord(id=c.id, name=c.name, capacity=c.capacity)
+            for c in Classroom.query.order_by(Classroom.id)]
+
+
+def _load_special_classes(loaded):
+    # special classes point at the records above by id, so their relationships are not loaded
+    subjects_by_id = {s.id: s for s in loaded["subjects"]}
+    batches_by_id = {b.id: b for b in loaded["batches"]}
+    classrooms_by_id = {c.id: c for c in loaded["classrooms"]}
+    return [
+        SpecialClassRecord(id=sc.id, subject_id=sc.subject_id, batch_id=sc.batch_id, room_id=sc.room_id,
+                           day=sc.day, period=sc.period,
+                           subject=subjects_by_id.get(sc.subject_id),
+                           batch=batches_by_id.get(sc.batch_id),
+                           classroom=classrooms_by_id.get(sc.room_id))
+        for sc in SpecialClass.query.options(lazyload("*")).order_by(SpecialClass.id)
+    ]
+
+
+# entity type -> (loader, types whose records it links to); in load order
+COLLECTIONS = {
+    "faculties": (_load_faculties, ()),
+    "subjects": (_load_subjects, ("faculties",)),
+    "batches": (_load_batches, ()),
+    "classrooms": (_load_classrooms, ()),
+    "special_classes": (_load_special_classes, ("subjects", "batches", "classrooms")),
+}
+
+
+def load_snapshot():
+    """Load all scheduling inputs in a fixed number of queries, however many rows there are."""
+    loaded = {}
+    for name, (load, _) in COLLECTIONS.items():
+        loaded[name] = load(loaded)
+    return Snapshot(**loaded)
+
+
+# ---------- CACHE ----------
+class SnapshotCache:
+    """Read-through cache of the snapshot, versioned per entity type.
+
+    Every write to an entity type must be followed (after its commit) by ``bump(type)``.
+    ``get`` then reloads that type and the types linking to it (a faculty edit reloads
+    subjects and special classes, not batches or rooms) and reuses the other collections.
+    Versions are per process, so writes from elsewhere (another worker, ``flask
+    import-data``) show up once the snapshot is ``max_age`` seconds old (None = never).
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self.versions = dict.fromkeys(COLLECTIONS, 0)
+        self.lock = threading.Lock()
+        self.collections = {}   # type -> (version, records)
+        self.snapshot = None
+        self.loaded_at = 0.0
+        self.hits = self.misses = 0
+
+    def bump(self, *types):
+        """Mark ``types`` (keys of COLLECTIONS) as changed."""
+        with self.lock:
+            for name in types:
+                self.versions[name] += 1
+
+    def clear(self):
+        self.bump(*COLLECTIONS)
+
+    def get(self):
+        """The current Snapshot, reloading only the entity types that changed since the last one."""
+        with self.lock:
+            if self.max_age is not None and time.monotonic() - self.loaded_at > self.max_age:
+                self.collections.clear()
+                self.snapshot = None
+            version = tuple(self.versions.values())
+            if self.snapshot is not None and self.snapshot.version == version:
+                self.hits += 1
+                return self.snapshot
+
+            self.misses += 1
+            if not self.collections:
+                self.loaded_at = time.monotonic()
+            loaded, reloaded = {}, set()
+            for name, (load, links) in COLLECTIONS.items():
+                cached = self.collections.get(name)
+                if cached is None or cached[0] != self.versions[name] or reloaded.intersection(links):
+                    cached = self.collections[name] = (self.versions[name], tuple(load(loaded)))
+                    reloaded.add(name)
+                loaded[name] = cached[1]
+            self.snapshot = Snapshot(**loaded, version=version)
+            return self.snapshot
+
+
+snapshot_cache = SnapshotCache(max_age=SNAPSHOT_MAX_AGE)
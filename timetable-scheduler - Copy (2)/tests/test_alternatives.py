@@ -0,0 +1,23 @@
+"""``top``: the alternatives saved for a job are distinct and never less feasible than the best.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+from genetic_scheduler import GeneticScheduler, DAYS
+from benchmarks.instances import make_instance, INSTANCES
+
+
+def test_top_leaves_out_less_feasible_genomes():
+    instance = make_instance(**INSTANCES["small"])
+    scheduler = GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms, DAYS,
+                                 instance.periods, seed=0, special_classes=instance.special_classes)
+    scheduler.population = ([scheduler.generate_greedy_timetable() for _ in range(3)] +
+                            [scheduler.generate_random_timetable() for _ in range(10)])
+    hard = {id(genome): scheduler._state(genome).hard_violations for genome in scheduler.population}
+    best = min(hard.values())
+    assert max(hard.values()) > best   # the random genomes are worse
+
+    options = scheduler.top(len(scheduler.population), min_distance=0)
+    assert options and scheduler.score(options[0]) == max(map(scheduler.score, scheduler.population))
+    assert all(hard[id(genome)] <= hard[id(options[0])] for genome in options)
+    assert len(options) == sum(hard[id(genome)] <= hard[id(options[0])] for genome in scheduler.population)
@@ -0,0 +1,96 @@
+"""The three ways of scoring a genome must agree: full ``evaluate``, the batched
+``evaluate_population`` and the delta updates of ``_derive`` / ``mutate``.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from genetic_scheduler import GeneticScheduler, Genome, DAYS, DELTA_LOOP_MAX
+from benchmarks.instances import make_instance, INSTANCES
+
+COUNTERS = ("faculty_busy", "room_busy", "subject_day")
+
+
+def make_scheduler(name="medium", seed=0, reserved=False, incremental=True):
+    instance = make_instance(**INSTANCES[name])
+    if reserved:   # as in a decomposed part: some faculty / room slots taken by other parts
+        rng = np.random.default_rng(seed)
+        n_slots = len(DAYS) * instance.periods
+        reserved = (rng.random(len(instance.faculties) * n_slots) < 0.1,
+                    rng.random(len(instance.classrooms) * n_slots) < 0.1)
+    return GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms, DAYS,
+                            instance.periods, seed=seed, incremental=incremental,
+                            special_classes=instance.special_classes, reserved=reserved or None)
+
+
+def assert_same_state(state, expected):
+    assert state.counts == expected.counts
+    for name in COUNTERS:
+        np.testing.assert_array_equal(getattr(state, name), getattr(expected, name))
+
+
+def neighbour(scheduler, genome, changes):
+    """``genome`` with about ``changes`` slots re-assigned (counters not kept)."""
+    other = Genome(genome.subjects.copy(), genome.rooms.copy())
+    for _ in range(changes):
+        other = scheduler.mutate(other)
+    other.state = None
+    return other.freeze()
+
+
+@pytest.mark.parametrize("name", ["small", "medium", "large"])
+@pytest.mark.parametrize("reserved", [False, True])
+def test_evaluate_population_matches_evaluate(name, reserved):
+    scheduler = make_scheduler(name, reserved=reserved)
+    genomes = [scheduler.generate_random_timetable() for _ in range(20)]
+    genomes += [scheduler.generate_greedy_timetable() for _ in range(5)]
+    batched = scheduler.evaluate_population(genomes).tolist()
+    assert batched == [scheduler.penalties.score(*scheduler.evaluate(g).counts) for g in genomes]
+
+
+@pytest.mark.parametrize("reserved", [False, True])
+def test_derive_matches_evaluate(reserved):
+    scheduler = make_scheduler(reserved=reserved)
+    all_rows = np.nonzero(np.ones(scheduler.shape[:2], dtype=bool))
+    paths = set()
+    for _ in range(100):
+        base = scheduler.generate_random_timetable()
+        scheduler.score(base)
+        # sizes around DELTA_LOOP_MAX exercise both the per-slot and the scatter-add update
+        changes = int(scheduler.rng.integers(1, 3 * DELTA_LOOP_MAX))
+        other = neighbour(scheduler, base, changes)
+        state = scheduler._derive(base, other, *all_rows)   # every row swapped: the result is ``other``
+        if state is not None:
+            paths.add(np.count_nonzero((base.subjects != other.subjects) | (base.rooms != other.rooms)) > DELTA_LOOP_MAX)
+            assert_same_state(state, scheduler.evaluate(other))
+    assert paths == {False, True}
+
+
+def test_crossover_counters_match_evaluate():
+    scheduler = make_scheduler("small")
+    derived = 0
+    for _ in range(200):
+        parent1 = scheduler.generate_random_timetable()
+        parent2 = neighbour(scheduler, parent1, int(scheduler.rng.integers(1, 8)))
+        scheduler.score(parent1), scheduler.score(parent2)
+        child = scheduler.crossover(parent1, parent2)
+        if child.state is not None and child not in (parent1, parent2):
+            derived += 1
+            assert_same_state(child.state, scheduler.evaluate(child))
+    assert derived > 0
+
+
+@pytest.mark.parametrize("incremental", [False, True])   # mutation keeps counters either way
+def test_mutate_counters_match_evaluate(incremental):
+    scheduler = make_scheduler(reserved=True, incremental=incremental)
+    genome = scheduler.generate_random_timetable()
+    scheduler.score(genome)
+    for i in range(300):
+        if i % 3 == 0:
+            genome.freeze()   # copy-on-write path: the counters are copied with the arrays
+        genome = scheduler.mutate(genome)
+        assert genome.state is not None
+        assert_same_state(genome.state, scheduler.evaluate(genome))
+        assert scheduler.score(genome) == scheduler.penalties.score(*scheduler.evaluate(genome).counts)
@@ -0,0 +1,33 @@
+"""Local search strategies: the annealing schedule follows the penalty weights, and
+an improved genome never scores worse than the one it started from.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+import math
+
+import pytest
+
+from genetic_scheduler import GeneticScheduler, Penalties, DAYS
+from benchmarks.instances import make_instance
+from local_search import STRATEGIES, SimulatedAnnealing
+
+
+@pytest.mark.parametrize("hard", [100, 1000])
+def test_annealing_accepts_a_hard_violation_at_the_start(hard):
+    annealing = SimulatedAnnealing()
+    assert math.exp(-hard / annealing.start_temperature(Penalties(hard=hard))) == pytest.approx(annealing.acceptance)
+    assert SimulatedAnnealing(temperature=3.0).start_temperature(Penalties(hard=hard)) == 3.0
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_improve_never_scores_worse(strategy):
+    instance = make_instance(12, tightness=1.0, special_classes=12)
+    scheduler = GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms, DAYS,
+                                 instance.periods, seed=0, special_classes=instance.special_classes)
+    search = STRATEGIES[strategy](time_budget=None, max_steps=200)
+    for _ in range(5):
+        genome = scheduler.generate_random_timetable()
+        improved = search.improve(scheduler, genome, None)
+        assert scheduler.score(improved) >= scheduler.score(genome)
+        assert scheduler._state(improved).counts == scheduler.evaluate(improved).counts
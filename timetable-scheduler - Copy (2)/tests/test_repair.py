@@ -0,0 +1,48 @@
+"""Run repair: disruption days, and moves that never add hard violations.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+import repair
+from repair import _Repair, disruption_days
+from genetic_scheduler import GeneticScheduler, DAYS
+from benchmarks.instances import make_instance
+
+
+def test_disruption_days():
+    assert disruption_days(start_date="2026-10-16", end_date="2026-10-19") == [DAYS.index("Monday"),
+                                                                               DAYS.index("Friday")]
+    assert disruption_days(days=["Tuesday", "Saturday"]) == [DAYS.index("Tuesday")]
+    with pytest.raises(ValueError, match="no teaching day"):
+        disruption_days(start_date="2026-10-17", end_date="2026-10-18")   # a weekend
+    with pytest.raises(ValueError, match="no teaching day"):
+        disruption_days(days=["Saturday"])
+
+
+@pytest.mark.parametrize("settle_steps", [0, repair.SETTLE_STEPS])   # 0: every settle fails and is rolled back
+def test_repair_never_adds_hard_violations(monkeypatch, settle_steps):
+    monkeypatch.setattr(repair, "SETTLE_STEPS", settle_steps)
+    # tightness 1.0: every faculty teaches nearly every period, so many moves add clashes
+    instance = make_instance(12, tightness=1.0)
+    unresolved_total = 0
+    for seed in range(5):
+        scheduler = GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms,
+                                     DAYS, instance.periods, seed=seed)
+        original = scheduler.generate_greedy_timetable()
+        before = scheduler._state(original).hard_violations
+        fixer = _Repair(scheduler, original, faculty=0, days=[0, 1])
+        unresolved = fixer.run()
+        repaired = fixer.walk.genome()
+
+        assert fixer.walk.state.counts == scheduler.evaluate(repaired).counts
+        assert fixer.walk.state.hard_violations <= before
+        for cell in unresolved:   # left as it was
+            assert repaired.subjects[cell] == original.subjects[cell]
+            assert repaired.rooms[cell] == original.rooms[cell]
+        assert not any(fixer.blocked(d, int(repaired.subjects[b, d, p]), int(repaired.rooms[b, d, p]))
+                       for b, d, p in zip(*np.nonzero(repaired.subjects >= 0)) if (b, d, p) not in unresolved)
+        unresolved_total += len(unresolved)
+    assert unresolved_total > 0
@@ -0,0 +1,31 @@
+"""Special classes are pinned genes; rows that cannot be pinned are skipped, not fatal.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+from genetic_scheduler import GeneticScheduler, DAYS
+from benchmarks.instances import Entity, make_instance
+
+
+def make_scheduler(special_classes):
+    instance = make_instance(batches=4, tightness=0.5)
+    return GeneticScheduler(instance.subjects, instance.faculties, instance.batches, instance.classrooms, DAYS,
+                            instance.periods, seed=0, special_classes=special_classes)
+
+
+def special(id, day="Monday", period=1, batch_id=1, subject_id=1, room_id=1):
+    return Entity(id=id, name=f"Special {id}", subject_id=subject_id, batch_id=batch_id, room_id=room_id,
+                  day=day, period=period)
+
+
+def test_unpinnable_special_classes_are_skipped():
+    scheduler = make_scheduler([special(1), special(2, day="Saturday"), special(3, period=12),
+                                special(4, subject_id=999), special(5, subject_id=2)])
+    assert [pin["id"] for pin in scheduler.skipped_pins] == [2, 3, 4, 5]
+    assert "outside" in scheduler.skipped_pins[0]["reason"]
+    assert "missing" in scheduler.skipped_pins[2]["reason"]
+    assert "overlaps" in scheduler.skipped_pins[3]["reason"]
+    assert [sc.id for sc in scheduler.special_classes] == [1]
+
+    for genome in (scheduler.generate_random_timetable(), scheduler.generate_greedy_timetable()):
+        assert genome.subjects[0, 0, 0] == 0 and genome.rooms[0, 0, 0] == 0